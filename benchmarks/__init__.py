@@ -0,0 +1,5 @@
+"""
+Benchmarks de performance du moteur, de l'agent et de l'entraînement.
+
+Usage : python -m benchmarks --output results.json --baseline benchmarks/baseline.json
+"""
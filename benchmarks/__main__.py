@@ -0,0 +1,87 @@
+import argparse
+import json
+import platform
+import sys
+import time
+from benchmarks import bench_engine, bench_agent, bench_training, bench_startup, bench_server
+
+SUITES = {
+    'engine': bench_engine,
+    'agent': bench_agent,
+    'training': bench_training,
+    'startup': bench_startup,
+    'server': bench_server
+}
+
+def compare(results, baseline, threshold):
+    """
+    Compare les résultats à une référence. Retourne la liste des régressions :
+    métriques dégradées de plus de threshold (fraction) dans le mauvais sens.
+    """
+    regressions = []
+    print(f"{'Métrique':<40} {'Référence':>14} {'Actuel':>14} {'Écart':>8}")
+    for name, current in sorted(results.items()):
+        reference = baseline.get(name)
+        if reference is None or reference['value'] == 0:
+            continue
+        change = current['value'] / reference['value'] - 1
+        worse = -change if current['higher_is_better'] else change
+        flag = ''
+        if worse > threshold:
+            flag = '  REGRESSION'
+            regressions.append(name)
+        print(f"{name:<40} {reference['value']:>14.1f} {current['value']:>14.1f} {change:>+8.1%}{flag}")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks de performance de Snake AI")
+    parser.add_argument('--suites', default=','.join(SUITES),
+                        help="Suites à exécuter, séparées par des virgules")
+    parser.add_argument('--quick', action='store_true', help="Mesures plus courtes (moins précises)")
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--baseline', help="Résultats de référence (JSON) à comparer")
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help="Dégradation relative tolérée avant de signaler une régression")
+    args = parser.parse_args(argv)
+    
+    results = {}
+    errors = {}
+    for name in args.suites.split(','):
+        print(f"== {name}")
+        # Une suite en échec est signalée sans empêcher les autres de mesurer
+        try:
+            suite_results = SUITES[name].run(quick=args.quick)
+        except Exception as e:
+            errors[name] = f"{type(e).__name__}: {e}"
+            print(f"Échec de la suite {name}: {errors[name]}")
+            continue
+        for metric_name, result in suite_results.items():
+            print(f"{metric_name:<40} {result['value']:>14.1f} {result['unit']}")
+        results.update(suite_results)
+    
+    report = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'results': results,
+        'errors': errors
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Résultats écrits dans {args.output}")
+    
+    status = 0
+    if errors:
+        print(f"{len(errors)} suite(s) en échec: {', '.join(errors)}")
+        status = 1
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} régression(s) au-delà de {args.threshold:.0%}")
+            status = 1
+    return status
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+import os
+import numpy as np
+from snake_logic import SnakeGame
+from snake_policy import CachedPolicy, NumpyPolicy
+from snake_replay import ReplayBuffer
+from benchmarks.common import metric, measure_rate, measure_latencies, tensorflow_available
+
+BATCH_SIZES = (64, 256, 1024)
+
+def _random_states(count, seed=0):
+    rng = np.random.default_rng(seed)
+    states = (rng.random((count, SnakeGame.STATE_SIZE)) < 0.3).astype(np.float32)
+    states[:, 11] = rng.random(count) * 0.1
+    return states
+
+def _fill(memory, count, seed=0, stride=0):
+    rng = np.random.default_rng(seed)
+    memory.add_batch(_random_states(count, seed), rng.integers(0, 4, size=count),
+                     rng.normal(size=count), _random_states(count, seed + 1),
+                     rng.random(count) < 0.05, stride)
+
+def _latency_metrics(prefix, latencies):
+    return {
+        f'{prefix}.p50': metric(np.percentile(latencies, 50), 'us', higher_is_better=False),
+        f'{prefix}.p99': metric(np.percentile(latencies, 99), 'us', higher_is_better=False)
+    }
+
+def run(quick=False):
+    """Benchmarks de l'inférence et de l'apprentissage"""
+    min_time = 0.2 if quick else 1.0
+    calls = 500 if quick else 5000
+    states = _random_states(calls)
+    results = {}
+    
+    # Mémoire d'expériences seule (NumPy)
+    memory = ReplayBuffer(100000, SnakeGame.STATE_SIZE, seed=0)
+    _fill(memory, 100000)
+    for batch_size in BATCH_SIZES:
+        rate = measure_rate(lambda: memory.sample(batch_size), batch_size, min_time)
+        results[f'replay.sample.b{batch_size}'] = metric(rate, 'samples/s')
+    
+    # Retours sur 3 pas calculés au tirage (8 séquences entrelacées, comme un acteur distribué)
+    memory = ReplayBuffer(100000, SnakeGame.STATE_SIZE, seed=0, n_step=3)
+    _fill(memory, 100000, stride=8)
+    rate = measure_rate(lambda: memory.sample(256), 256, min_time)
+    results['replay.sample.b256.n3'] = metric(rate, 'samples/s')
+    
+    if not tensorflow_available():
+        print("TensorFlow absent : benchmarks DQNAgent ignorés")
+        return results
+    
+    os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '2')
+    from snake_dqn_agent import DQNAgent
+    agent = DQNAgent(SnakeGame.STATE_SIZE, 4, memory_size=100000)
+    _fill(agent.memory, 100000)
+    
+    # Latence de décision : Keras et NumPy
+    counter = [0]
+    
+    def keras_act():
+        agent.act(states[counter[0] % calls], training=False)
+        counter[0] += 1
+    
+    results.update(_latency_metrics('agent.act.keras', measure_latencies(keras_act, calls)))
+    
+    policy = NumpyPolicy(agent.model.get_weights())
+    
+    def numpy_act():
+        policy.act(states[counter[0] % calls])
+        counter[0] += 1
+    
+    results.update(_latency_metrics('agent.act.numpy', measure_latencies(numpy_act, calls)))
+    
+    # Décisions mémorisées par état : les états de test sont tous distincts, on rejoue
+    # donc les 64 premiers pour mesurer le coût d'une décision trouvée dans le cache
+    cached = CachedPolicy(policy)
+    
+    def cached_act():
+        cached.act(states[counter[0] % 64])
+        counter[0] += 1
+    
+    results.update(_latency_metrics('agent.act.cached', measure_latencies(cached_act, calls)))
+    
+    # Débit de l'étape d'apprentissage
+    for batch_size in BATCH_SIZES:
+        rate = measure_rate(lambda: agent.replay(batch_size), batch_size, min_time)
+        results[f'agent.replay.b{batch_size}'] = metric(rate, 'samples/s')
+    return results
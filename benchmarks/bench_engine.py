@@ -0,0 +1,73 @@
+import numpy as np
+from snake_logic import SnakeGame, VecSnakeGame
+from benchmarks.common import metric, measure_rate
+
+# Plateaux mesurés (en cases) et longueurs du serpent en fraction du plateau
+BOARD_SIZES = (10, 20, 40)
+LENGTH_FRACTIONS = (0.0, 0.25, 0.75)
+
+def hamiltonian_cycle(grid_width, grid_height):
+    """
+    Cycle passant une fois par chaque case (grid_width pair) : descente de la
+    colonne 0, zigzag sur les lignes 1..h-1, puis retour par la ligne 0.
+    """
+    cycle = [y * grid_width for y in range(grid_height)]
+    for x in range(1, grid_width):
+        rows = range(grid_height - 1, 0, -1) if x % 2 else range(1, grid_height)
+        cycle.extend(y * grid_width + x for y in rows)
+    cycle.extend(x for x in range(grid_width - 1, 0, -1))
+    return cycle
+
+def _cycle_actions(cycle, grid_width):
+    """Action à jouer depuis chaque position du cycle pour aller à la suivante"""
+    moves = {-grid_width: SnakeGame.UP, 1: SnakeGame.RIGHT, grid_width: SnakeGame.DOWN, -1: SnakeGame.LEFT}
+    return [moves[cycle[(i + 1) % len(cycle)] - cycle[i]] for i in range(len(cycle))]
+
+def bench_step(grid_size, length_fraction, steps=2000, min_time=1.0):
+    """Pas SnakeGame.step par seconde avec un serpent de longueur donnée qui suit le cycle"""
+    game = SnakeGame(grid_size * 10, grid_size * 10, 10, seed=0)
+    game.max_steps_without_food = float('inf')
+    cycle = hamiltonian_cycle(grid_size, grid_size)
+    actions = _cycle_actions(cycle, grid_size)
+    position = {cell: i for i, cell in enumerate(cycle)}
+    length = max(1, int(length_fraction * game.num_cells))
+    state = np.empty(SnakeGame.STATE_SIZE, dtype=np.float32)
+    
+    def place():
+        head = length - 1
+        game.place_snake([cycle[head - i] for i in range(length)], actions[head - 1] if head else None)
+    
+    def run():
+        place()
+        for _ in range(steps):
+            _, _, done = game.step(actions[position[game.body[0]]], out=state)
+            if done or len(game.body) > length + 10:
+                place()
+    
+    return measure_rate(run, steps, min_time)
+
+def bench_vec_step(num_envs=1024, grid_size=20, min_time=1.0):
+    """Pas d'environnement par seconde de VecSnakeGame (actions aléatoires)"""
+    env = VecSnakeGame(num_envs, grid_size * 10, grid_size * 10, 10, seed=0)
+    rng = np.random.default_rng(0)
+    actions = rng.integers(0, 4, size=(64, num_envs))
+    out = np.empty((num_envs, SnakeGame.STATE_SIZE), dtype=np.float32)
+    counter = [0]
+    
+    def run():
+        env.step(actions[counter[0] % 64], out=out)
+        counter[0] += 1
+    
+    return measure_rate(run, num_envs, min_time)
+
+def run(quick=False):
+    """Benchmarks du moteur de jeu"""
+    min_time = 0.2 if quick else 1.0
+    results = {}
+    for grid_size in BOARD_SIZES:
+        for fraction in LENGTH_FRACTIONS:
+            length = max(1, int(fraction * grid_size * grid_size))
+            rate = bench_step(grid_size, fraction, min_time=min_time)
+            results[f'engine.step.{grid_size}x{grid_size}.len{length}'] = metric(rate, 'steps/s')
+    results['engine.vec_step.1024x20x20'] = metric(bench_vec_step(min_time=min_time), 'steps/s')
+    return results
@@ -0,0 +1,55 @@
+import asyncio
+import os
+import time
+import numpy as np
+from snake_logic import SnakeGame
+from snake_policy import NumpyPolicy
+from snake_server import InferenceServer, play_session, run_games
+from benchmarks.common import metric, tensorflow_available
+
+async def _direct_games(policy, num_games, episodes):
+    """Parties simultanées appelant chacune policy.act pour un seul état (sans serveur)"""
+    async def act(state):
+        return policy.act(state, training=False)
+    
+    envs = [SnakeGame(400, 400, 20, seed=i) for i in range(num_games)]
+    start = time.perf_counter()
+    results = await asyncio.gather(*(play_session(act, env, episodes) for env in envs))
+    return sum(moves for _, moves in results), time.perf_counter() - start
+
+async def _served_games(policy, num_games, episodes):
+    async with InferenceServer(policy, max_batch_size=num_games) as server:
+        _, moves, elapsed = await run_games(server, num_games, episodes)
+    return moves, elapsed, server.stats.summary()
+
+def _bench(prefix, policy, num_games, episodes):
+    results = {}
+    moves, elapsed = asyncio.run(_direct_games(policy, num_games, episodes))
+    results[f'{prefix}.direct.g{num_games}'] = metric(moves / elapsed, 'moves/s')
+    moves, elapsed, summary = asyncio.run(_served_games(policy, num_games, episodes))
+    results[f'{prefix}.batched.g{num_games}'] = metric(moves / elapsed, 'moves/s')
+    results[f'{prefix}.batched.g{num_games}.p99'] = metric(summary['latency_ms_p99'], 'ms', higher_is_better=False)
+    return results
+
+def run(quick=False):
+    """Débit de nombreuses parties simultanées : une inférence par coup contre le serveur par lots"""
+    num_games = 64 if quick else 256
+    episodes = 1 if quick else 4
+    rng = np.random.default_rng(0)
+    sizes = (SnakeGame.STATE_SIZE, 64, 64, 4)
+    weights = []
+    for fan_in, fan_out in zip(sizes[:-1], sizes[1:]):
+        weights += [rng.normal(size=(fan_in, fan_out)) * 0.3, np.zeros(fan_out)]
+    results = _bench('server.numpy', NumpyPolicy(weights), num_games, episodes)
+    
+    if not tensorflow_available():
+        print("TensorFlow absent : serveur avec un modèle Keras non mesuré")
+        return results
+    
+    os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '2')
+    from snake_dqn_agent import DQNAgent
+    agent = DQNAgent(SnakeGame.STATE_SIZE, 4, inference_only=True)
+    agent.model.set_weights(weights)
+    agent.invalidate_cache()
+    results.update(_bench('server.keras', agent, num_games, episodes))
+    return results
@@ -0,0 +1,74 @@
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+from snake_logic import SnakeGame
+from snake_policy import NumpyPolicy
+from benchmarks.common import metric, tensorflow_available
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Charger une politique et jouer un coup, comme snake_test.py / snake_eval.py
+PLAY_ONE = """
+from snake_logic import SnakeGame
+from snake_policy import load_policy
+env = SnakeGame(400, 400, 20, seed=0)
+load_policy({path!r}).act(env.reset())
+"""
+
+# Même chose avec un DQNAgent d'inférence (chemin de repli sans h5py)
+PLAY_ONE_KERAS = """
+from snake_logic import SnakeGame
+from snake_dqn_agent import DQNAgent
+env = SnakeGame(400, 400, 20, seed=0)
+agent = DQNAgent(12, 4, inference_only=True)
+agent.load({path!r})
+agent.act(env.reset(), training=False)
+"""
+
+def cold_start(code, repeats=3):
+    """Meilleur temps (s) d'exécution de code dans un interpréteur neuf"""
+    env = dict(os.environ, PYTHONPATH=ROOT, TF_CPP_MIN_LOG_LEVEL='2')
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', code], cwd=ROOT, env=env, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def run(quick=False):
+    """Temps de démarrage à froid (import des modules, chargement d'un modèle)"""
+    repeats = 1 if quick else 3
+    results = {}
+    
+    def measure(name, code):
+        results[f'startup.{name}'] = metric(cold_start(code, repeats), 's', higher_is_better=False)
+    
+    measure('python', 'pass')
+    measure('import_snake_train', 'import snake_train')
+    measure('import_snake_test', 'import snake_test')
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        rng = np.random.default_rng(0)
+        sizes = (SnakeGame.STATE_SIZE, 64, 64, 4)
+        weights = []
+        for fan_in, fan_out in zip(sizes[:-1], sizes[1:]):
+            weights += [rng.normal(size=(fan_in, fan_out)), np.zeros(fan_out)]
+        npz_path = os.path.join(tmp, 'policy.npz')
+        NumpyPolicy.save(npz_path, weights)
+        measure('play_npz', PLAY_ONE.format(path=npz_path))
+        
+        if not tensorflow_available():
+            print("TensorFlow absent : démarrage avec un modèle Keras non mesuré")
+            return results
+        
+        # Poids Keras écrits dans un processus séparé pour ne pas charger TensorFlow ici
+        h5_path = os.path.join(tmp, 'model.weights.h5')
+        cold_start("from snake_dqn_agent import DQNAgent\n"
+                   f"DQNAgent(12, 4, inference_only=True).model.save_weights({h5_path!r})", repeats=1)
+        measure('play_h5', PLAY_ONE.format(path=h5_path))
+        measure('play_keras', PLAY_ONE_KERAS.format(path=h5_path))
+    return results
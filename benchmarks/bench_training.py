@@ -0,0 +1,26 @@
+import os
+import tempfile
+import time
+from benchmarks.common import metric, tensorflow_available
+
+def run(quick=False):
+    """Débit de bout en bout de l'entraînement sans visualisation (épisodes/s)"""
+    if not tensorflow_available():
+        print("TensorFlow absent : benchmark d'entraînement ignoré")
+        return {}
+    
+    os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '2')
+    from snake_train import train_dqn_agent_headless
+    
+    episodes = 20 if quick else 100
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        # Les modèles et graphiques sont écrits dans un répertoire temporaire
+        os.chdir(tmp)
+        try:
+            start = time.perf_counter()
+            train_dqn_agent_headless(episodes=episodes, save_every=episodes + 1)
+            elapsed = time.perf_counter() - start
+        finally:
+            os.chdir(cwd)
+    return {'training.headless': metric(episodes / elapsed, 'episodes/s')}
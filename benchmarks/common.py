@@ -0,0 +1,39 @@
+import time
+import numpy as np
+
+def metric(value, unit, higher_is_better=True):
+    """Résultat d'un benchmark tel qu'il est écrit dans le JSON"""
+    return {'value': float(value), 'unit': unit, 'higher_is_better': higher_is_better}
+
+def measure_rate(fn, count_per_call, min_time=1.0, repeats=3):
+    """
+    Appelle fn en boucle pendant au moins min_time secondes, repeats fois, et
+    retourne le meilleur débit (unités/s), moins sensible au bruit de la machine.
+    """
+    fn()  # Échauffement
+    best = 0.0
+    for _ in range(repeats):
+        calls = 0
+        start = time.perf_counter()
+        elapsed = 0.0
+        while elapsed < min_time:
+            fn()
+            calls += 1
+            elapsed = time.perf_counter() - start
+        best = max(best, calls * count_per_call / elapsed)
+    return best
+
+def measure_latencies(fn, calls):
+    """Latences individuelles (en microsecondes) de calls appels à fn"""
+    fn()  # Échauffement
+    latencies = np.empty(calls)
+    for i in range(calls):
+        start = time.perf_counter_ns()
+        fn()
+        latencies[i] = time.perf_counter_ns() - start
+    return latencies / 1000.0
+
+def tensorflow_available():
+    """Les benchmarks de l'agent DQN ne tournent que si TensorFlow est installé"""
+    import importlib.util
+    return importlib.util.find_spec('tensorflow') is not None
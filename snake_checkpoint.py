@@ -0,0 +1,137 @@
+import json
+import os
+import random
+import threading
+import numpy as np
+
+class CheckpointManager:
+    """
+    Points de reprise complets de l'entraînement : poids du modèle et du modèle
+    cible, état de l'optimiseur, epsilon, compteurs, états des générateurs
+    aléatoires (graines d'épisodes du jeu comprises), mémoire d'expériences et
+    fenêtre de métriques.
+    
+    save_async() copie l'état en mémoire (seule partie bloquante pour la boucle
+    d'entraînement) puis l'écrit dans un thread en arrière-plan, dans un
+    fichier temporaire renommé atomiquement : le fichier path est toujours un
+    point de reprise complet, même si le processus est interrompu.
+    """
+    def __init__(self, path="snake_checkpoint.npz"):
+        self.path = path
+        self._thread = None
+        self._error = None
+    
+    def exists(self):
+        return os.path.exists(self.path)
+    
+    def snapshot(self, agent, counters, metrics=None, env=None):
+        """Copie synchrone de l'état d'entraînement : dictionnaire de tableaux pour np.savez"""
+        arrays = {}
+        model_weights = agent.model.get_weights()
+        for i, w in enumerate(model_weights):
+            arrays[f'model_{i}'] = w
+        # Sans modèle cible (TabularAgent), la reprise n'a rien à restaurer
+        target_weights = agent.target_model.get_weights() if agent.target_model is not None else []
+        for i, w in enumerate(target_weights):
+            arrays[f'target_{i}'] = w
+        optimizer_weights = agent.get_optimizer_weights()
+        for i, w in enumerate(optimizer_weights):
+            arrays[f'optimizer_{i}'] = w
+        
+        # Mémoire : les tableaux vont dans le .npz, le reste dans les métadonnées JSON
+        memory = {}
+        for key, value in agent.memory.state_dict().items():
+            if isinstance(value, np.ndarray):
+                arrays[f'memory_{key}'] = value
+            else:
+                memory[key] = value
+        
+        np_state = np.random.get_state()
+        arrays['numpy_random_keys'] = np_state[1]
+        python_state = random.getstate()
+        meta = {
+            'counters': dict(counters),
+            'epsilon': agent.epsilon,
+            'train_steps': agent.train_steps,
+            'num_model_weights': len(model_weights),
+            'num_optimizer_weights': len(optimizer_weights),
+            'memory': memory,
+            'python_random': [python_state[0], list(python_state[1]), python_state[2]],
+            'numpy_random': [np_state[0], int(np_state[2]), int(np_state[3]), float(np_state[4])]
+        }
+        if env is not None:
+            # Le jeu tire la graine de chaque épisode de son propre générateur
+            meta['env_seeds'] = env.get_seed_state()
+        if metrics is not None:
+            meta['metrics'] = {
+                'scores': metrics.scores.values(),
+                'max_score': metrics.max_score,
+                'episodes': metrics.episodes
+            }
+        arrays['meta'] = np.array(json.dumps(meta))
+        return arrays
+    
+    def save_async(self, agent, counters, metrics=None, env=None):
+        """Copie l'état puis l'écrit en arrière-plan (une seule écriture à la fois)"""
+        arrays = self.snapshot(agent, counters, metrics, env)
+        self.wait()
+        self._thread = threading.Thread(target=self._write, args=(arrays,), name='checkpoint')
+        self._thread.start()
+    
+    def save(self, agent, counters, metrics=None, env=None):
+        """Écriture synchrone (fin d'entraînement)"""
+        self.save_async(agent, counters, metrics, env)
+        self.wait()
+    
+    def _write(self, arrays):
+        tmp_path = self.path + '.tmp'
+        try:
+            with open(tmp_path, 'wb') as f:
+                np.savez(f, **arrays)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            self._error = e
+    
+    def wait(self):
+        """Attend la fin de l'écriture en cours et remonte son éventuelle erreur"""
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+    
+    def restore(self, agent, metrics=None, env=None):
+        """Restaure exactement l'état sauvegardé et retourne les compteurs"""
+        self.wait()
+        with np.load(self.path) as data:
+            meta = json.loads(str(data['meta']))
+            agent.model.set_weights([data[f'model_{i}'] for i in range(meta['num_model_weights'])])
+            if agent.target_model is not None:
+                agent.target_model.set_weights([data[f'target_{i}'] for i in range(meta['num_model_weights'])])
+            agent.invalidate_cache()
+            agent.set_optimizer_weights([data[f'optimizer_{i}'] for i in range(meta['num_optimizer_weights'])])
+            agent.epsilon = meta['epsilon']
+            agent.train_steps = meta['train_steps']
+            
+            memory = dict(meta['memory'])
+            for key in data.files:
+                if key.startswith('memory_'):
+                    memory[key[len('memory_'):]] = data[key]
+            agent.memory.load_state_dict(memory)
+            
+            version, internal, gauss = meta['python_random']
+            random.setstate((version, tuple(internal), gauss))
+            name, pos, has_gauss, cached_gaussian = meta['numpy_random']
+            np.random.set_state((name, data['numpy_random_keys'], pos, has_gauss, cached_gaussian))
+            if env is not None and 'env_seeds' in meta:
+                env.set_seed_state(meta['env_seeds'])
+        
+        if metrics is not None and 'metrics' in meta:
+            for score in meta['metrics']['scores']:
+                metrics.scores.append(score)
+            metrics.max_score = meta['metrics']['max_score']
+            metrics.episodes = meta['metrics']['episodes']
+        return meta['counters']
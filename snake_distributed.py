@@ -0,0 +1,320 @@
+import argparse
+import os
+import queue
+import time
+from collections import deque
+import multiprocessing as mp
+import numpy as np
+from snake_logic import SnakeGame, VecSnakeGame
+from snake_policy import NumpyPolicy
+
+# Réduire les messages de TensorFlow (chargé uniquement par le learner)
+os.environ['TF_CPP_MIN_LOG_LEVEL'] = '2'
+
+class SharedTransitionQueue:
+    """
+    File producteur unique / consommateur unique en mémoire partagée : num_slots
+    blocs de chunk_size transitions, synchronisés par deux sémaphores.
+    Un acteur y écrit ses transitions, le learner les lit sans sérialisation.
+    """
+    def __init__(self, ctx, state_size, chunk_size, num_slots=8):
+        self.state_size = state_size
+        self.chunk_size = chunk_size
+        self.num_slots = num_slots
+        rows = num_slots * chunk_size
+        self._raw = {
+            'states': ctx.RawArray('f', rows * state_size),
+            'actions': ctx.RawArray('i', rows),
+            'rewards': ctx.RawArray('f', rows),
+            'next_states': ctx.RawArray('f', rows * state_size),
+            'dones': ctx.RawArray('f', rows)
+        }
+        self._filled = ctx.Semaphore(0)
+        self._empty = ctx.Semaphore(num_slots)
+        # Positions locales : le producteur et le consommateur ont chacun leur copie
+        self._write_slot = 0
+        self._read_slot = 0
+        self._views = None
+    
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_views'] = None  # Les vues NumPy sont recréées dans chaque processus
+        return state
+    
+    def _slot_views(self):
+        if self._views is None:
+            shape = (self.num_slots, self.chunk_size)
+            state_shape = shape + (self.state_size,)
+            self._views = {
+                'states': np.frombuffer(self._raw['states'], dtype=np.float32).reshape(state_shape),
+                'actions': np.frombuffer(self._raw['actions'], dtype=np.int32).reshape(shape),
+                'rewards': np.frombuffer(self._raw['rewards'], dtype=np.float32).reshape(shape),
+                'next_states': np.frombuffer(self._raw['next_states'], dtype=np.float32).reshape(state_shape),
+                'dones': np.frombuffer(self._raw['dones'], dtype=np.float32).reshape(shape)
+            }
+        return self._views
+    
+    def put(self, states, actions, rewards, next_states, dones, timeout=None):
+        """Écrit un bloc complet ; retourne False si aucun emplacement ne s'est libéré à temps"""
+        if not self._empty.acquire(timeout=timeout):
+            return False
+        views = self._slot_views()
+        slot = self._write_slot
+        views['states'][slot] = states
+        views['actions'][slot] = actions
+        views['rewards'][slot] = rewards
+        views['next_states'][slot] = next_states
+        views['dones'][slot] = dones
+        self._write_slot = (slot + 1) % self.num_slots
+        self._filled.release()
+        return True
+    
+    def get(self):
+        """Lit un bloc sans attendre ; retourne None si la file est vide"""
+        if not self._filled.acquire(block=False):
+            return None
+        views = self._slot_views()
+        slot = self._read_slot
+        chunk = (views['states'][slot].copy(), views['actions'][slot].copy(),
+                 views['rewards'][slot].copy(), views['next_states'][slot].copy(),
+                 views['dones'][slot].copy())
+        self._read_slot = (slot + 1) % self.num_slots
+        self._empty.release()
+        return chunk
+
+class SharedWeights:
+    """Poids du réseau publiés par le learner dans une mémoire partagée versionnée"""
+    def __init__(self, ctx, shapes):
+        self.shapes = [tuple(shape) for shape in shapes]
+        self.sizes = [int(np.prod(shape)) for shape in self.shapes]
+        self._data = ctx.RawArray('f', sum(self.sizes))
+        self._version = ctx.Value('q', 0)
+    
+    def publish(self, weights):
+        """Copie les poids (liste de tableaux) et incrémente la version"""
+        flat = np.frombuffer(self._data, dtype=np.float32)
+        with self._version.get_lock():
+            flat[:] = np.concatenate([np.ravel(w) for w in weights])
+            self._version.value += 1
+    
+    def version(self):
+        return self._version.value
+    
+    def read(self):
+        """Retourne (version, poids) lus de façon cohérente"""
+        flat = np.frombuffer(self._data, dtype=np.float32)
+        with self._version.get_lock():
+            version = self._version.value
+            data = flat.copy()
+        weights = []
+        offset = 0
+        for shape, size in zip(self.shapes, self.sizes):
+            weights.append(data[offset:offset + size].reshape(shape))
+            offset += size
+        return version, weights
+
+def actor_epsilon(actor_id, num_actors, base=0.4, alpha=7.0):
+    """Taux d'exploration fixe de chaque acteur (de base à base^(1+alpha), comme Ape-X)"""
+    if num_actors == 1:
+        return base
+    return base ** (1 + alpha * actor_id / (num_actors - 1))
+
+def _actor_main(actor_id, epsilon, transition_queue, shared_weights, stats_queue, stop_event,
+                envs_per_actor, sync_every, seed):
+    """Boucle d'un acteur : joue avec une copie locale de la politique et envoie ses transitions"""
+    env = VecSnakeGame(envs_per_actor, width=400, height=400, cell_size=20, seed=seed)
+    rng = np.random.default_rng(seed)
+    chunk_size = transition_queue.chunk_size
+    state_size = transition_queue.state_size
+    
+    # Bloc de transitions en cours de remplissage
+    chunk_states = np.zeros((chunk_size, state_size), dtype=np.float32)
+    chunk_actions = np.zeros(chunk_size, dtype=np.int32)
+    chunk_rewards = np.zeros(chunk_size, dtype=np.float32)
+    chunk_next_states = np.zeros((chunk_size, state_size), dtype=np.float32)
+    chunk_dones = np.zeros(chunk_size, dtype=np.float32)
+    filled = 0
+    finished_scores = []
+    
+    # Attend la première publication des poids
+    while shared_weights.version() == 0 and not stop_event.is_set():
+        time.sleep(0.01)
+    version, weights = shared_weights.read()
+    policy = NumpyPolicy(weights)
+    
+    states = env.reset()
+    tick = 0
+    while not stop_event.is_set():
+        # Synchronisation périodique des poids publiés par le learner
+        tick += 1
+        if tick % sync_every == 0 and shared_weights.version() != version:
+            version, weights = shared_weights.read()
+            policy = NumpyPolicy(weights)
+        
+        # Politique epsilon-gloutonne propre à l'acteur, un seul passage pour tous ses plateaux
+        actions = policy.act_batch(states)
+        explore = rng.random(envs_per_actor) < epsilon
+        actions[explore] = rng.integers(0, 4, size=int(explore.sum()))
+        
+        next_states, rewards, dones = env.step(actions)
+        
+        # Pour les plateaux terminés, l'état suivant stocké est l'état final de l'épisode
+        stored_next = next_states.copy()
+        stored_next[dones] = env.terminal_states[dones]
+        finished_scores.extend(env.final_scores[dones].tolist())
+        
+        # Remplissage du bloc (envs_per_actor lignes par pas, chunk_size en est un multiple)
+        rows = slice(filled, filled + envs_per_actor)
+        chunk_states[rows] = states
+        chunk_actions[rows] = actions
+        chunk_rewards[rows] = rewards
+        chunk_next_states[rows] = stored_next
+        chunk_dones[rows] = dones
+        filled += envs_per_actor
+        states = next_states
+        
+        if filled == chunk_size:
+            while not transition_queue.put(chunk_states, chunk_actions, chunk_rewards,
+                                           chunk_next_states, chunk_dones, timeout=0.1):
+                if stop_event.is_set():
+                    return
+            filled = 0
+            if finished_scores:
+                stats_queue.put((actor_id, finished_scores))
+                finished_scores = []
+
+def train_distributed(num_actors=4, envs_per_actor=8, updates=100000, batch_size=64,
+                      memory_size=1000000, update_target_every=1000, broadcast_every=100,
+                      chunk_size=256, sync_every=50, learning_starts=1000, log_every=1000,
+                      memory_path=None, n_step=1):
+    """
+    Entraînement acteurs / learner sur une seule machine.
+    
+    Chaque acteur est un processus qui joue envs_per_actor parties avec une copie
+    NumPy de la politique et son propre epsilon. Le learner (ce processus) possède
+    la mémoire d'expériences et l'optimiseur ; il reçoit les transitions via des
+    files en mémoire partagée et republie les poids tous les broadcast_every
+    gradients.
+    
+    Args:
+        num_actors: Nombre de processus acteurs
+        envs_per_actor: Nombre de plateaux joués en parallèle par chaque acteur
+        updates: Nombre total de pas de gradient du learner
+        batch_size: Taille du batch pour l'apprentissage
+        memory_size: Capacité de la mémoire d'expériences du learner
+        update_target_every: Fréquence (en pas de gradient) de mise à jour du modèle cible
+        broadcast_every: Fréquence (en pas de gradient) de publication des poids aux acteurs
+        chunk_size: Nombre de transitions par bloc envoyé par un acteur
+        sync_every: Fréquence (en pas d'environnement) de lecture des poids par les acteurs
+        learning_starts: Nombre minimal de transitions avant le premier apprentissage
+        log_every: Fréquence (en pas de gradient) d'affichage des progrès
+        memory_path: Répertoire d'une mémoire d'expériences sur disque (np.memmap), rouverte
+            si elle existe : l'apprentissage reprend avec un tampon déjà rempli
+        n_step: Nombre de pas des retours (suivis à l'intérieur des blocs de chaque acteur)
+    """
+    from snake_dqn_agent import DQNAgent
+    
+    if chunk_size % envs_per_actor:
+        raise ValueError("chunk_size doit être un multiple de envs_per_actor")
+    
+    # Processus démarrés par spawn : les acteurs n'héritent pas de l'état de TensorFlow
+    ctx = mp.get_context('spawn')
+    state_size = SnakeGame.STATE_SIZE
+    agent = DQNAgent(state_size, 4, memory_size=memory_size, memory_path=memory_path, n_step=n_step)
+    
+    shared_weights = SharedWeights(ctx, [w.shape for w in agent.model.get_weights()])
+    shared_weights.publish(agent.model.get_weights())
+    queues = [SharedTransitionQueue(ctx, state_size, chunk_size) for _ in range(num_actors)]
+    stats_queue = ctx.Queue()
+    stop_event = ctx.Event()
+    
+    actors = []
+    for actor_id in range(num_actors):
+        epsilon = actor_epsilon(actor_id, num_actors)
+        actor = ctx.Process(target=_actor_main, daemon=True,
+                            args=(actor_id, epsilon, queues[actor_id], shared_weights, stats_queue,
+                                  stop_event, envs_per_actor, sync_every, actor_id))
+        actor.start()
+        actors.append(actor)
+    
+    recent_scores = deque(maxlen=100)
+    episodes = 0
+    transitions = 0
+    step = 0
+    start = time.time()
+    
+    try:
+        while step < updates:
+            # Récupère tous les blocs disponibles de chaque acteur
+            received = 0
+            for transition_queue in queues:
+                chunk = transition_queue.get()
+                while chunk is not None:
+                    # Un bloc contient des pas successifs des plateaux de l'acteur, entrelacés
+                    agent.memory.add_batch(*chunk, stride=envs_per_actor)
+                    received += chunk_size
+                    chunk = transition_queue.get()
+            transitions += received
+            
+            while True:
+                try:
+                    _, scores = stats_queue.get_nowait()
+                except queue.Empty:
+                    break
+                episodes += len(scores)
+                recent_scores.extend(scores)
+            
+            if len(agent.memory) < max(batch_size, learning_starts):
+                if received == 0:
+                    time.sleep(0.001)
+                continue
+            
+            agent.replay(batch_size)
+            step += 1
+            
+            if step % update_target_every == 0:
+                agent.update_target_model()
+            if step % broadcast_every == 0:
+                shared_weights.publish(agent.model.get_weights())
+            if step % log_every == 0:
+                elapsed = time.time() - start
+                avg_score = np.mean(recent_scores) if recent_scores else 0.0
+                print(f"Updates: {step}/{updates}, Episodes: {episodes}, Avg Score: {avg_score:.2f}, "
+                      f"Transitions/s: {transitions / elapsed:.0f}, Updates/s: {step / elapsed:.1f}")
+    finally:
+        stop_event.set()
+        for actor in actors:
+            actor.join(timeout=5)
+            if actor.is_alive():
+                actor.terminate()
+    
+    # Sauvegarde du modèle final : la politique NumPy et la mémoire sur disque d'abord,
+    # elles ne dépendent pas du format de fichier de Keras
+    agent.export_numpy("snake_model.npz")
+    agent.memory.flush()
+    agent.save("snake_model.h5")
+    return agent
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Entraînement DQN distribué (acteurs / learner)")
+    parser.add_argument('--actors', type=int, default=max(1, (os.cpu_count() or 2) - 1))
+    parser.add_argument('--envs-per-actor', type=int, default=8)
+    parser.add_argument('--updates', type=int, default=100000)
+    parser.add_argument('--batch-size', type=int, default=64)
+    parser.add_argument('--memory-size', type=int, default=1000000)
+    parser.add_argument('--update-target-every', type=int, default=1000)
+    parser.add_argument('--broadcast-every', type=int, default=100)
+    parser.add_argument('--memory-path', metavar='DIR',
+                        help="Mémoire d'expériences sur disque (np.memmap), conservée entre les entraînements")
+    parser.add_argument('--n-step', type=int, default=1, help="Nombre de pas des retours de Bellman")
+    args = parser.parse_args()
+    
+    train_distributed(num_actors=args.actors,
+                      envs_per_actor=args.envs_per_actor,
+                      updates=args.updates,
+                      batch_size=args.batch_size,
+                      memory_size=args.memory_size,
+                      update_target_every=args.update_target_every,
+                      broadcast_every=args.broadcast_every,
+                      memory_path=args.memory_path,
+                      n_step=args.n_step)
@@ -1,86 +1,198 @@
 import numpy as np
 import tensorflow as tf
 from tensorflow import keras
-from collections import deque
 import random
 import os
+from snake_replay import make_replay_buffer
+from snake_policy import NumpyPolicy, QCache, find_keras_weights, keras3_weights_name
+
+# Keras 3 n'accepte que des noms en .weights.h5 pour save_weights (tf.keras 2 : n'importe quel .h5)
+KERAS_3 = int(keras.__version__.split('.')[0]) >= 3
 
 class DQNAgent:
-    def __init__(self, state_size, action_size):
+    def __init__(self, state_size, action_size, memory_size=10000, prioritized=False, memory_path=None,
+                 gamma=0.95, epsilon_decay=0.995, learning_rate=0.001, hidden_sizes=(64, 64),
+                 n_step=1, q_cache=False, inference_only=False, memory_readonly=False):
         self.state_size = state_size  # Taille de l'état (12 dans notre cas)
         self.action_size = action_size  # Nombre d'actions possibles (4: haut, droite, bas, gauche)
-        self.memory = deque(maxlen=10000)  # Mémoire pour stocker les expériences
-        self.gamma = 0.95  # Facteur d'actualisation
-        self.epsilon = 1.0  # Taux d'exploration initial
+        # Avec inference_only, l'agent ne sert qu'à jouer : un seul modèle, non compilé,
+        # ni mémoire, ni modèle cible, ni optimiseur (construction bien plus rapide)
+        self.inference_only = inference_only
+        self.gamma = gamma  # Facteur d'actualisation
+        # Retours sur n pas : la récompense de la nourriture remonte de n pas par mise à jour
+        self.n_step = n_step
+        # Mémoire pour stocker les expériences (priorisée par l'erreur TD si demandé)
+        # Avec memory_path, la mémoire est sur disque et réutilisée d'un entraînement à l'autre ;
+        # avec memory_readonly, elle est seulement lue (partagée par plusieurs learners)
+        # et remember() n'écrit rien
+        self.prioritized = prioritized
+        if inference_only:
+            self.memory = None
+        else:
+            self.memory = make_replay_buffer(memory_size, state_size, memory_path, memory_readonly,
+                                             prioritized, n_step=n_step, gamma=gamma)
+        self.epsilon = 0.0 if inference_only else 1.0  # Taux d'exploration initial
         self.epsilon_min = 0.01  # Taux d'exploration minimum
-        self.epsilon_decay = 0.995  # Décroissance du taux d'exploration
-        self.learning_rate = 0.001  # Taux d'apprentissage
-        self.model = self._build_model()  # Modèle de réseau de neurones
+        self.epsilon_decay = epsilon_decay  # Décroissance du taux d'exploration
+        self.learning_rate = learning_rate  # Taux d'apprentissage
+        self.hidden_sizes = tuple(hidden_sizes)  # Taille des couches cachées
+        self.train_steps = 0  # Nombre de mises à jour du gradient effectuées
+        # Décisions gloutonnes mémorisées par état, invalidées à chaque changement des poids
+        self.q_cache = QCache() if q_cache else None
+        # Copie NumPy des poids pour act() (un coup sans passer par Keras), reconstruite après chaque modification
+        self._policy = None
+        self.model = self._build_model(compile=not inference_only)  # Modèle de réseau de neurones
+        if inference_only:
+            self.target_model = None
+            return
         self.target_model = self._build_model()  # Modèle cible (pour stabilité)
         self.update_target_model()  # Copie des poids initiaux
+        self._train_step = self._build_train_step()  # Étape d'entraînement compilée
         
-    def _build_model(self):
+    def _build_model(self, compile=True):
         """Construit le réseau de neurones pour approximer la fonction Q"""
-        model = keras.Sequential([
-            keras.layers.Dense(64, input_dim=self.state_size, activation='relu'),
-            keras.layers.Dense(64, activation='relu'),
-            keras.layers.Dense(self.action_size, activation='linear')
-        ])
-        model.compile(loss='mse', optimizer=keras.optimizers.Adam(learning_rate=self.learning_rate))
+        layers = [keras.layers.Input(shape=(self.state_size,))]
+        layers += [keras.layers.Dense(size, activation='relu') for size in self.hidden_sizes]
+        layers.append(keras.layers.Dense(self.action_size, activation='linear'))
+        model = keras.Sequential(layers)
+        if compile:
+            model.compile(loss='mse', optimizer=keras.optimizers.Adam(learning_rate=self.learning_rate))
         return model
     
+    def _build_train_step(self):
+        """
+        Construit l'étape d'entraînement compilée en graphe : calcul vectoriel des
+        cibles de Bellman et descente de gradient en un seul appel. Le facteur
+        d'actualisation est propre à chaque transition (gamma^k pour un retour
+        sur k pas).
+        """
+        model = self.model
+        target_model = self.target_model
+        optimizer = model.optimizer
+        action_size = self.action_size
+        
+        @tf.function
+        def train_step(states, actions, rewards, next_states, dones, weights, discounts):
+            # Cible : R + gamma^k * max Q_cible(s_k, a'), sans bootstrap si l'épisode est terminé
+            q_next = tf.reduce_max(target_model(next_states, training=False), axis=1)
+            targets = rewards + discounts * q_next * (1.0 - dones)
+            
+            with tf.GradientTape() as tape:
+                q_taken = tf.gather(model(states, training=True), actions, batch_dims=1)
+                td_errors = targets - q_taken
+                # Même perte que fit() sur la cible complète : la MSE sur les action_size
+                # sorties ne voit que l'erreur de l'action jouée
+                loss = tf.reduce_mean(weights * tf.square(td_errors)) / action_size
+            
+            gradients = tape.gradient(loss, model.trainable_variables)
+            optimizer.apply_gradients(zip(gradients, model.trainable_variables))
+            return td_errors
+        
+        return train_step
+    
     def update_target_model(self):
         """Copie les poids du modèle principal vers le modèle cible"""
         self.target_model.set_weights(self.model.get_weights())
+        self.invalidate_cache()
+    
+    def invalidate_cache(self):
+        """À appeler après toute modification directe des poids du modèle"""
+        self._policy = None
+        if self.q_cache is not None:
+            self.q_cache.invalidate()
     
     def remember(self, state, action, reward, next_state, done):
-        """Stocke une expérience dans la mémoire"""
-        self.memory.append((state, action, reward, next_state, done))
+        """Stocke une expérience dans la mémoire (sauf si elle est en lecture seule)"""
+        self.memory.add(state, action, reward, next_state, done)
     
     def act(self, state, training=True):
         """Choisit une action à partir de l'état actuel (avec exploration possible)"""
         if training and np.random.rand() <= self.epsilon:
             return random.randrange(self.action_size)  # Action aléatoire (exploration)
         
-        act_values = self.model.predict(np.array([state]), verbose=0)
-        return np.argmax(act_values[0])  # Action avec la plus grande valeur Q (exploitation)
+        if self.q_cache is not None:
+            return self.q_cache.act(state, self._greedy_action)
+        return self._greedy_action(state)
+    
+    def _greedy_action(self, state):
+        if self._policy is None:
+            self._policy = NumpyPolicy(self.model.get_weights())
+        return self._policy.act(state)  # Action avec la plus grande valeur Q (exploitation)
+    
+    def act_batch(self, states):
+        """Actions gloutonnes pour un batch d'états (N, state_size) en une seule passe, sans exploration"""
+        if self.q_cache is not None:
+            return self.q_cache.act_batch(states, self._greedy_batch)
+        return self._greedy_batch(states)
+    
+    def _greedy_batch(self, states):
+        return np.argmax(self.model(states, training=False).numpy(), axis=1)
     
     def replay(self, batch_size):
         """Entraîne le modèle sur un batch d'expériences"""
         if len(self.memory) < batch_size:
             return
         
-        minibatch = random.sample(self.memory, batch_size)
-        
-        states = np.array([experience[0] for experience in minibatch])
-        actions = np.array([experience[1] for experience in minibatch])
-        rewards = np.array([experience[2] for experience in minibatch])
-        next_states = np.array([experience[3] for experience in minibatch])
-        dones = np.array([experience[4] for experience in minibatch])
+        # Retours sur n pas déjà calculés par la mémoire au moment du tirage
+        if self.prioritized:
+            states, actions, rewards, next_states, dones, discounts, indices, weights = self.memory.sample(batch_size)
+        else:
+            states, actions, rewards, next_states, dones, discounts = self.memory.sample(batch_size)
+            weights = np.ones(batch_size, dtype=np.float32)
         
-        # Calcul des valeurs cibles
-        target = self.model.predict(states, verbose=0)
-        target_next = self.target_model.predict(next_states, verbose=0)
+        # Calcul des cibles et entraînement du modèle en un seul appel compilé
+        # (pondéré par les poids d'échantillonnage préférentiel si la mémoire est priorisée)
+        td_errors = self._train_step(states, actions, rewards, next_states, dones, weights, discounts)
+        self.train_steps += 1
+        self.invalidate_cache()
         
-        for i in range(batch_size):
-            if dones[i]:
-                target[i][actions[i]] = rewards[i]
-            else:
-                target[i][actions[i]] = rewards[i] + self.gamma * np.amax(target_next[i])
-        
-        # Entraînement du modèle
-        self.model.fit(states, target, epochs=1, verbose=0)
+        # Les priorités suivent l'erreur TD de chaque transition
+        if self.prioritized:
+            self.memory.update_priorities(indices, td_errors.numpy())
         
         # Diminution du taux d'exploration
         if self.epsilon > self.epsilon_min:
             self.epsilon *= self.epsilon_decay
     
+    def _optimizer_variables(self):
+        variables = self.model.optimizer.variables
+        return variables() if callable(variables) else variables  # Méthode dans tf.keras 2
+    
+    def get_optimizer_weights(self):
+        """État de l'optimiseur (itérations, moments d'Adam) sous forme de tableaux NumPy"""
+        return [np.array(v) for v in self._optimizer_variables()]
+    
+    def set_optimizer_weights(self, weights):
+        """Restaure l'état de l'optimiseur ; ses variables sont créées si besoin"""
+        variables = self._optimizer_variables()
+        if len(variables) != len(weights):
+            self.model.optimizer.build(self.model.trainable_variables)
+            variables = self._optimizer_variables()
+        if len(variables) != len(weights):
+            raise ValueError(f"État d'optimiseur incompatible: {len(weights)} variables, "
+                             f"{len(variables)} attendues")
+        for variable, value in zip(variables, weights):
+            variable.assign(value)
+    
     def load(self, name):
-        """Charge les poids d'un modèle sauvegardé"""
+        """Charge les poids d'un modèle sauvegardé (snake_model.h5 trouve aussi snake_model.weights.h5)"""
+        name = find_keras_weights(name)
         if os.path.exists(name):
             self.model.load_weights(name)
-            self.update_target_model()
+            self.invalidate_cache()
+            if self.target_model is not None:
+                self.update_target_model()
     
     def save(self, name):
-        """Sauvegarde les poids du modèle"""
-        self.model.save_weights(name)
\ No newline at end of file
+        """
+        Sauvegarde les poids du modèle ; avec Keras 3, sous le nom en .weights.h5
+        correspondant (snake_model.h5 -> snake_model.weights.h5). Retourne le
+        chemin écrit.
+        """
+        path = keras3_weights_name(name) if KERAS_3 else name
+        self.model.save_weights(path)
+        return path
+    
+    def export_numpy(self, name):
+        """Exporte les poids du modèle en .npz pour NumpyPolicy (inférence sans TensorFlow)"""
+        NumpyPolicy.save(name, self.model.get_weights())
\ No newline at end of file
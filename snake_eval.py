@@ -0,0 +1,160 @@
+import argparse
+import glob
+import json
+import math
+import multiprocessing as mp
+import os
+import numpy as np
+from snake_logic import VecSnakeGame
+from snake_policy import CachedPolicy, NumpyPolicy, load_policy
+from snake_tabular import TabularAgent
+
+# Réduire les messages de TensorFlow (chargé uniquement pour lire un modèle Keras)
+os.environ['TF_CPP_MIN_LOG_LEVEL'] = '2'
+
+CAUSE_LABELS = {'wall': 'mur', 'self': 'corps', 'timeout': 'faim', 'won': 'victoire'}
+
+def load_numpy_policy(model_path, state_size=12, action_size=4):
+    """
+    Politique NumPy d'un modèle (.npz, table Q ou poids Keras) ; TensorFlow
+    n'est importé que si h5py ne sait pas lire le fichier.
+    """
+    policy = load_policy(model_path, state_size, action_size)
+    if isinstance(policy, (NumpyPolicy, TabularAgent)):
+        return policy
+    return NumpyPolicy(policy.model.get_weights())
+
+def play_episodes(policy, episodes, num_envs=256, width=400, height=400, cell_size=20, seed=None):
+    """
+    Joue episodes parties gloutonnes sur num_envs plateaux simulés ensemble,
+    avec une seule passe avant par pas pour tous les plateaux.
+    Retourne (scores, steps, causes), un élément par épisode ; causes indexe
+    VecSnakeGame.END_CAUSES.
+    """
+    num_envs = min(num_envs, episodes)
+    env = VecSnakeGame(num_envs, width, height, cell_size, seed=seed)
+    
+    # Chaque plateau joue un nombre fixe d'épisodes : s'arrêter aux premiers
+    # épisodes terminés favoriserait les parties courtes
+    quota = np.full(num_envs, episodes // num_envs)
+    quota[:episodes % num_envs] += 1
+    played = np.zeros(num_envs, dtype=np.int64)
+    scores, steps, causes = [], [], []
+    
+    states = env.reset()
+    while (played < quota).any():
+        states, _, dones = env.step(policy.act_batch(states), out=states)
+        if dones.any():
+            counted = np.flatnonzero(dones & (played < quota))
+            scores.append(env.final_scores[counted])
+            steps.append(env.final_steps[counted])
+            causes.append(env.end_causes[counted])
+            played += dones
+    
+    return np.concatenate(scores), np.concatenate(steps), np.concatenate(causes)
+
+def _play_worker(args):
+    policy, episodes, num_envs, board, seed, cache = args
+    return play_episodes(CachedPolicy(policy) if cache else policy, episodes, num_envs, *board, seed=seed)
+
+def _wilson_interval(k, n, z=1.96):
+    """Intervalle de confiance de Wilson pour une proportion k / n"""
+    if n == 0:
+        return [0.0, 0.0]
+    p = k / n
+    center = (p + z * z / (2 * n)) / (1 + z * z / n)
+    half = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / (1 + z * z / n)
+    return [max(0.0, center - half), min(1.0, center + half)]
+
+def summarize(scores, steps, causes, z=1.96):
+    """
+    Statistiques d'évaluation : moyenne du score avec son intervalle de
+    confiance (approximation normale), médiane avec intervalle par
+    statistiques d'ordre, pas par épisode et répartition des causes de fin
+    (intervalles de Wilson).
+    """
+    n = len(scores)
+    mean = float(scores.mean())
+    std = float(scores.std(ddof=1)) if n > 1 else 0.0
+    half = z * std / math.sqrt(n)
+    
+    # Rangs de l'intervalle de la médiane : n/2 ± z*sqrt(n)/2
+    ordered = np.sort(scores)
+    low = max(0, int(math.floor(n / 2 - z * math.sqrt(n) / 2)))
+    high = min(n - 1, int(math.ceil(n / 2 + z * math.sqrt(n) / 2)))
+    
+    counts = np.bincount(causes, minlength=len(VecSnakeGame.END_CAUSES))
+    return {
+        'episodes': n,
+        'score_mean': mean,
+        'score_mean_ci95': [mean - half, mean + half],
+        'score_std': std,
+        'score_median': float(np.median(scores)),
+        'score_median_ci95': [float(ordered[low]), float(ordered[high])],
+        'score_min': int(ordered[0]),
+        'score_max': int(ordered[-1]),
+        'steps_mean': float(steps.mean()),
+        'steps_median': float(np.median(steps)),
+        'steps_max': int(steps.max()),
+        'end_causes': {name: {'count': int(count), 'share': count / n, 'ci95': _wilson_interval(count, n, z)}
+                       for name, count in zip(VecSnakeGame.END_CAUSES, counts)}
+    }
+
+def evaluate(model_path, episodes=1000, num_envs=256, workers=1, seed=None,
+             width=400, height=400, cell_size=20, cache=False):
+    """
+    Évalue un modèle sans rendu ni pause sur episodes parties, réparties sur
+    workers processus qui simulent chacun num_envs plateaux en parallèle.
+    Avec cache, le réseau n'est évalué qu'une fois par état distinct.
+    Retourne le dictionnaire de summarize().
+    """
+    policy = load_numpy_policy(model_path)
+    board = (width, height, cell_size)
+    workers = max(1, min(workers, episodes))
+    if workers == 1:
+        results = [play_episodes(CachedPolicy(policy) if cache else policy, episodes, num_envs, *board,
+                                 seed=seed)]
+    else:
+        # Les processus reçoivent la politique NumPy : aucun n'importe TensorFlow
+        seeds = np.random.SeedSequence(seed).spawn(workers)
+        shares = [episodes // workers + (i < episodes % workers) for i in range(workers)]
+        with mp.get_context('spawn').Pool(workers) as pool:
+            results = pool.map(_play_worker, [(policy, share, num_envs, board, worker_seed, cache)
+                                              for share, worker_seed in zip(shares, seeds)])
+    scores, steps, causes = (np.concatenate(parts) for parts in zip(*results))
+    return summarize(scores, steps, causes)
+
+def print_summary(model_path, summary):
+    low, high = summary['score_mean_ci95']
+    causes = ', '.join(f"{CAUSE_LABELS[name]} {cause['share']:.1%}"
+                       for name, cause in summary['end_causes'].items())
+    print(f"{model_path}: {summary['episodes']} épisodes, score moyen {summary['score_mean']:.2f} "
+          f"[{low:.2f}, {high:.2f}], médiane {summary['score_median']:.0f}, max {summary['score_max']}, "
+          f"pas moyens {summary['steps_mean']:.0f} ({causes})")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Évaluation rapide et sans rendu de modèles entraînés")
+    parser.add_argument('models', nargs='+',
+                        help="Modèles à comparer (.h5 ou .npz), motifs acceptés : 'snake_model_checkpoint_*.h5'")
+    parser.add_argument('--episodes', type=int, default=1000)
+    parser.add_argument('--envs', type=int, default=256, help="Plateaux simulés en parallèle par processus")
+    parser.add_argument('--workers', type=int, default=1, help="Nombre de processus")
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--cache', action='store_true',
+                        help="Mémorise la décision du réseau pour chaque état distinct")
+    parser.add_argument('--output', metavar='JSON', help="Écrit les résultats détaillés en JSON")
+    args = parser.parse_args()
+    
+    model_paths = [path for pattern in args.models for path in sorted(glob.glob(pattern)) or [pattern]]
+    results = {}
+    for model_path in model_paths:
+        results[model_path] = evaluate(model_path, args.episodes, args.envs, args.workers, args.seed,
+                                        cache=args.cache)
+        print_summary(model_path, results[model_path])
+    
+    if len(results) > 1:
+        best = max(results, key=lambda path: results[path]['score_mean'])
+        print(f"Meilleur modèle: {best} (score moyen {results[best]['score_mean']:.2f})")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
@@ -1,6 +1,7 @@
 import pygame
 import sys
 from snake_logic import SnakeGame
+from snake_renderer import GameView
 
 class SnakeGameUI:
     # Couleurs
@@ -16,12 +17,14 @@ class SnakeGameUI:
         self.height = height
         self.cell_size = cell_size
         
-        # Création de la fenêtre
-        self.window = pygame.display.set_mode((width, height))
-        pygame.display.set_caption('Snake Minimal')
-        
-        # Initialisation du jeu
+        # Initialisation du jeu (sans limite de pas sans nourriture pour un joueur humain)
         self.game = SnakeGame(width, height, cell_size)
+        self.game.max_steps_without_food = float('inf')
+        
+        # Création de la fenêtre (barre de score au-dessus du plateau)
+        colors = {'bg': self.BLACK, 'snake': self.GREEN, 'food': self.RED, 'text': self.WHITE}
+        self.view = GameView(self.game, 'Snake Minimal', colors)
+        self.window = self.view.screen
         
         # Autres paramètres
         self.clock = pygame.time.Clock()
@@ -45,35 +48,9 @@ class SnakeGameUI:
         return True
     
     def draw(self):
-        # Efface l'écran
-        self.window.fill(self.BLACK)
-        
-        # Dessine la nourriture
-        food = self.game.get_food()
-        pygame.draw.rect(self.window, self.RED, 
-                         (food[0], food[1], self.cell_size, self.cell_size))
-        
-        # Dessine le serpent
-        snake = self.game.get_snake()
-        for segment in snake:
-            pygame.draw.rect(self.window, self.GREEN, 
-                            (segment[0], segment[1], self.cell_size, self.cell_size))
-        
-        # Affiche le score
-        score_text = f"Score: {self.game.get_score()}"
-        font = pygame.font.Font(None, 36)
-        text = font.render(score_text, True, self.WHITE)
-        self.window.blit(text, (10, 10))
-        
-        # Affiche un message de fin de jeu si nécessaire
-        if self.game.is_game_over():
-            game_over_text = "Game Over! Appuyez sur R pour rejouer"
-            go_text = font.render(game_over_text, True, self.WHITE)
-            text_rect = go_text.get_rect(center=(self.width/2, self.height/2))
-            self.window.blit(go_text, text_rect)
-        
-        # Met à jour l'affichage
-        pygame.display.update()
+        # Seules les cases modifiées (tête, queue, nourriture) et le score sont redessinés
+        message = "Game Over! Appuyez sur R pour rejouer" if self.game.is_game_over() else None
+        self.view.draw(self.game, message)
     
     def run(self):
         running = True
@@ -1,6 +1,22 @@
 import random
+from collections import deque
 import numpy as np
 
+def build_neighbor_table(grid_width, grid_height):
+    """
+    Table (num_cells, 4) donnant, pour chaque case et chaque action, l'indice de
+    la case voisine dans cette direction, ou -1 si elle est hors du plateau.
+    """
+    xs = np.tile(np.arange(grid_width), grid_height)
+    ys = np.repeat(np.arange(grid_height), grid_width)
+    table = np.empty((grid_width * grid_height, 4), dtype=np.int64)
+    for action, (dx, dy) in enumerate(zip(SnakeGame.DX, SnakeGame.DY)):
+        nx = xs + dx
+        ny = ys + dy
+        inside = (nx >= 0) & (nx < grid_width) & (ny >= 0) & (ny < grid_height)
+        table[:, action] = np.where(inside, ny * grid_width + nx, -1)
+    return table
+
 class SnakeGame:
     # Actions possibles
     UP = 0
@@ -8,187 +24,615 @@ class SnakeGame:
     DOWN = 2
     LEFT = 3
     
+    # Déplacements (en cases) associés à chaque action
+    DX = (0, 1, 0, -1)
+    DY = (-1, 0, 1, 0)
+    
+    # Directions à vérifier pour les dangers selon la direction actuelle : devant, droite, gauche
+    DANGER_DIRECTIONS = ((0, 1, 3), (1, 2, 0), (2, 3, 1), (3, 0, 2))
+    
+    # Taille du vecteur d'état retourné par get_state
+    STATE_SIZE = 12
+    
     # Récompenses
     REWARD_FOOD = 100
     REWARD_DEATH = -100
     REWARD_STEP = -0.1  # Petite pénalité pour chaque pas pour encourager l'efficacité
+    REWARD_LOOP = -10  # Retour à un plateau déjà vu depuis la dernière nourriture (loop_detection='penalize')
     
-    def __init__(self, width, height, cell_size):
+    # Modes de détection des boucles (loop_detection)
+    LOOP_MODES = (None, 'end', 'penalize')
+    
+    def __init__(self, width, height, cell_size, seed=None, loop_detection=None):
         self.width = width
         self.height = height
         self.cell_size = cell_size
+        self.grid_width = width // cell_size
+        self.grid_height = height // cell_size
+        self.num_cells = self.grid_width * self.grid_height
+        self.max_steps_without_food = 100  # Pour éviter les boucles infinies
+        
+        # Détection des boucles : un plateau (corps, direction, nourriture) qui se répète
+        # depuis la dernière nourriture termine l'épisode ('end', avec REWARD_DEATH comme
+        # à l'expiration de max_steps_without_food) ou coûte REWARD_LOOP ('penalize')
+        if loop_detection not in self.LOOP_MODES:
+            raise ValueError(f"Détection des boucles inconnue: {loop_detection}")
+        self.loop_detection = loop_detection
+        self._visited = set()  # Empreintes des plateaux vus depuis la dernière nourriture
+        self.loops = 0  # Répétitions détectées dans l'épisode
+        
+        # Générateurs propres à l'instance : _seeds tire la graine de chaque épisode
+        # et rng, réinitialisé avec cette graine, tire la nourriture. Un épisode est
+        # donc entièrement déterminé par episode_seed et la suite des actions.
+        self._seeds = random.Random(seed)
+        self.rng = random.Random()
+        self.episode_seed = None
+        
+        # Tables précalculées : voisins de chaque case (à plat, indice cell * 4 + action)
+        # et coordonnées (en cases) de chaque case
+        self._neighbors = build_neighbor_table(self.grid_width, self.grid_height).ravel().tolist()
+        self._cell_x = [cell % self.grid_width for cell in range(self.num_cells)]
+        self._cell_y = [cell // self.grid_width for cell in range(self.num_cells)]
+        
+        # Clés de Zobrist (64 bits, graine fixe) : un segment est identifié par sa case et la
+        # direction du segment suivant vers la queue (4 pour la queue), ce qui fixe l'ordre du
+        # corps. La clé de nourriture d'indice -1 (plateau plein) est nulle.
+        keys = random.Random(0)
+        self._zobrist_body = [keys.getrandbits(64) for _ in range(self.num_cells * 5)]
+        self._zobrist_direction = [keys.getrandbits(64) for _ in range(4)]
+        self._zobrist_food = [keys.getrandbits(64) for _ in range(self.num_cells)] + [0]
+        # Lien de chaque case occupée vers le segment suivant, et empreinte du corps (XOR des clés)
+        self._links = [4] * self.num_cells
+        self._body_hash = 0
+        
+        # Grille d'occupation indexée par case (1 si un segment du serpent s'y trouve)
+        self.occupied = np.zeros(self.num_cells, dtype=np.uint8)
+        # Corps du serpent sous forme d'indices de cases (la tête en premier)
+        self.body = deque()
+        # Index des cases libres : permutation des cases dont les _num_free
+        # premières sont libres, avec la position de chaque case (retrait par échange)
+        self._identity = list(range(self.num_cells))
+        self._free = self._identity.copy()
+        self._free_pos = self._identity.copy()
+        self._num_free = self.num_cells
         self.reset()
     
-    def reset(self):
+    def reset(self, out=None, seed=None):
+        """
+        Démarre un nouvel épisode et retourne l'état initial. seed fixe la graine
+        de l'épisode (pour rejouer un épisode enregistré) ; sinon elle est tirée
+        du générateur de l'instance.
+        """
+        self.episode_seed = seed if seed is not None else self._seeds.getrandbits(63)
+        self.rng.seed(self.episode_seed)
+        
+        # Plateau vide dans son état canonique (index des cases libres compris) :
+        # l'épisode ne dépend que de sa graine et des actions jouées
+        self.occupied.fill(0)
+        self.body.clear()
+        self._free = self._identity.copy()
+        self._free_pos = self._identity.copy()
+        self._num_free = self.num_cells
+        
         # Position initiale du serpent (au centre)
-        center_x = (self.width // self.cell_size) // 2 * self.cell_size
-        center_y = (self.height // self.cell_size) // 2 * self.cell_size
-        self.snake = [[center_x, center_y]]
-        self.direction = [self.cell_size, 0]  # Direction initiale: droite
+        center = (self.grid_height // 2) * self.grid_width + self.grid_width // 2
+        self.body.append(center)
+        self._occupy(center)
+        self._direction = self.RIGHT  # Direction initiale: droite
         self.generate_food()
         self.game_over = False
+        self.won = False  # Vrai si le serpent a rempli tout le plateau
         self.score = 0
+        self.steps = 0  # Pas joués dans l'épisode
         self.steps_without_food = 0
-        self.max_steps_without_food = 100  # Pour éviter les boucles infinies
+        self._next_action = None
+        self._rehash()
+        self.loops = 0
         
         # Retourner l'état initial
-        return self.get_state()
+        return self.get_state(out)
+    
+    def place_snake(self, cells, direction=None):
+        """
+        Place le serpent sur les cases données (la tête en premier) et tire une
+        nouvelle nourriture. Utile pour les tests et les benchmarks.
+        """
+        for cell in self.body:
+            self._release(cell)
+        self.body.clear()
+        for cell in cells:
+            self.body.append(cell)
+            self._occupy(cell)
+        if direction is not None:
+            self._direction = direction
+        self.generate_food()
+        self.game_over = False
+        self.won = False
+        self.steps_without_food = 0
+        self._rehash()
+    
+    def get_seed_state(self):
+        """État du générateur des graines d'épisodes, sérialisable en JSON (points de reprise)"""
+        version, internal, gauss = self._seeds.getstate()
+        return [version, list(internal), gauss]
+    
+    def set_seed_state(self, state):
+        """Restaure l'état retourné par get_seed_state : les épisodes suivants sont les mêmes"""
+        version, internal, gauss = state
+        self._seeds.setstate((version, tuple(internal), gauss))
+    
+    def cell_to_pixel(self, cell):
+        """Convertit un indice de case en coordonnées pixels [x, y]"""
+        return [(cell % self.grid_width) * self.cell_size,
+                (cell // self.grid_width) * self.cell_size]
+    
+    @property
+    def snake(self):
+        """Corps du serpent en coordonnées pixels (calculé à la demande pour le rendu)"""
+        return [self.cell_to_pixel(cell) for cell in self.body]
+    
+    @property
+    def food(self):
+        """Position de la nourriture en coordonnées pixels (None si le plateau est plein)"""
+        if self.food_cell < 0:
+            return None
+        return self.cell_to_pixel(self.food_cell)
+    
+    @property
+    def direction(self):
+        """Direction actuelle en pixels, par exemple [cell_size, 0] vers la droite"""
+        return [self.DX[self._direction] * self.cell_size,
+                self.DY[self._direction] * self.cell_size]
+    
+    def change_direction(self, direction):
+        """
+        Mémorise la direction demandée par le joueur, en pixels (par exemple
+        [0, -cell_size] vers le haut) ; elle est appliquée au prochain update().
+        """
+        dx = (direction[0] > 0) - (direction[0] < 0)
+        dy = (direction[1] > 0) - (direction[1] < 0)
+        for action in (self.UP, self.RIGHT, self.DOWN, self.LEFT):
+            if (self.DX[action], self.DY[action]) == (dx, dy):
+                self._next_action = action
+    
+    def update(self):
+        """Avance d'un pas dans la dernière direction demandée (interface graphique)"""
+        if self.game_over:
+            return
+        action = self._direction if self._next_action is None else self._next_action
+        self._next_action = None
+        self.step(action)
+    
+    def get_snake(self):
+        return self.snake
+    
+    def get_food(self):
+        return self.food
+    
+    def get_score(self):
+        return self.score
+    
+    def is_game_over(self):
+        return self.game_over
+    
+    def _occupy(self, cell):
+        """Marque la case comme occupée et la retire de l'index des cases libres"""
+        self.occupied[cell] = 1
+        pos = self._free_pos[cell]
+        last_pos = self._num_free - 1
+        last = self._free[last_pos]
+        self._free[pos] = last
+        self._free_pos[last] = pos
+        self._free[last_pos] = cell
+        self._free_pos[cell] = last_pos
+        self._num_free = last_pos
+    
+    def _release(self, cell):
+        """Marque la case comme libre et la remet dans l'index des cases libres"""
+        self.occupied[cell] = 0
+        pos = self._free_pos[cell]
+        first_pos = self._num_free
+        first = self._free[first_pos]
+        self._free[pos] = first
+        self._free_pos[first] = pos
+        self._free[first_pos] = cell
+        self._free_pos[cell] = first_pos
+        self._num_free = first_pos + 1
+    
+    def _hash_body(self):
+        """Met à jour les liens du corps et retourne son empreinte, calculée en O(longueur)"""
+        body = list(self.body)
+        body_hash = 0
+        for cell, nxt in zip(body, body[1:] + [None]):
+            link = 4 if nxt is None else self._neighbors[cell * 4:cell * 4 + 4].index(nxt)
+            self._links[cell] = link
+            body_hash ^= self._zobrist_body[cell * 5 + link]
+        return body_hash
+    
+    def _rehash(self):
+        """Nouvel historique des plateaux, à partir du plateau actuel (détection des boucles seulement)"""
+        self._visited.clear()
+        if self.loop_detection is not None:
+            self._body_hash = self._hash_body()
+            self._visited.add(self.board_hash)
+    
+    def _track_board(self, new_head, tail):
+        """
+        Met à jour l'empreinte du corps en O(1) après un pas (tail vaut -1 si le
+        serpent a mangé) et l'ajoute à l'historique. Retourne True si le plateau
+        a déjà été vu depuis la dernière nourriture.
+        """
+        links = self._links
+        zobrist = self._zobrist_body
+        # La nouvelle tête est reliée à l'ancienne (direction opposée au mouvement)
+        link = (self._direction + 2) % 4
+        links[new_head] = link
+        body_hash = self._body_hash ^ zobrist[new_head * 5 + link]
+        if tail < 0:
+            # Le corps a grandi : aucun plateau précédent ne peut se répéter
+            self._visited.clear()
+        else:
+            # L'avant-dernier segment devient la queue
+            new_tail = self.body[-1]
+            body_hash ^= (zobrist[tail * 5 + links[tail]] ^ zobrist[new_tail * 5 + links[new_tail]] ^
+                          zobrist[new_tail * 5 + 4])
+            links[new_tail] = 4
+        self._body_hash = body_hash
+        
+        board_hash = self.board_hash
+        if board_hash in self._visited:
+            return True
+        self._visited.add(board_hash)
+        return False
+    
+    @property
+    def board_hash(self):
+        """
+        Empreinte de Zobrist du plateau : corps (dans l'ordre), direction et
+        nourriture. Tenue à jour en O(1) par pas avec loop_detection, recalculée
+        sinon.
+        """
+        body_hash = self._body_hash if self.loop_detection is not None else self._hash_body()
+        return body_hash ^ self._zobrist_direction[self._direction] ^ self._zobrist_food[self.food_cell]
     
     def generate_food(self):
-        # Génère de la nourriture à une position aléatoire (sur la grille)
-        max_x = (self.width // self.cell_size) - 1
-        max_y = (self.height // self.cell_size) - 1
-        
-        while True:
-            food_x = random.randint(0, max_x) * self.cell_size
-            food_y = random.randint(0, max_y) * self.cell_size
-            food_pos = [food_x, food_y]
-            
-            # S'assure que la nourriture n'apparaît pas sur le serpent
-            if food_pos not in self.snake:
-                self.food = food_pos
-                break
+        # Tire la nourriture uniformément parmi les cases libres (jamais sur le serpent)
+        if self._num_free == 0:
+            self.food_cell = -1  # Plateau plein: plus de place pour la nourriture
+        else:
+            self.food_cell = self._free[self.rng.randrange(self._num_free)]
     
-    def get_state(self):
+    def get_state(self, out=None):
         """
         Convertit l'état du jeu en une représentation adaptée à l'IA.
-        Retourne un tableau numpy avec les informations pertinentes.
-        """
-        head_x, head_y = self.snake[0]
-        food_x, food_y = self.food
+        Retourne un tableau numpy float32 de taille STATE_SIZE avec les informations pertinentes.
         
-        # Normalisation des coordonnées pour les rendre indépendantes de la taille du jeu
-        grid_width = self.width // self.cell_size
-        grid_height = self.height // self.cell_size
+        out: tableau float32 préalloué (ou ligne d'un batch) à remplir ; s'il est
+        fourni, aucune allocation n'est faite et out est retourné.
+        """
+        if out is None:
+            out = np.empty(self.STATE_SIZE, dtype=np.float32)
+        head = self.body[0]
+        food = self.food_cell if self.food_cell >= 0 else head
+        direction = self._direction
+        neighbors = self._neighbors
+        occupied = self.occupied
         
-        # État vectoriel simple
-        state = np.zeros(12)
+        out.fill(0)
         
         # Direction du serpent (one-hot encoding)
-        if self.direction == [0, -self.cell_size]:  # Haut
-            state[0] = 1
-        elif self.direction == [self.cell_size, 0]:  # Droite
-            state[1] = 1
-        elif self.direction == [0, self.cell_size]:  # Bas
-            state[2] = 1
-        elif self.direction == [-self.cell_size, 0]:  # Gauche
-            state[3] = 1
-        
-        # Danger immédiat (1 si danger, 0 sinon)
-        # Vérifier danger devant
-        check_x = head_x + self.direction[0]
-        check_y = head_y + self.direction[1]
-        state[4] = 1 if (check_x < 0 or check_x >= self.width or 
-                         check_y < 0 or check_y >= self.height or
-                         [check_x, check_y] in self.snake) else 0
-        
-        # Vérifier danger à droite (relatif à la direction actuelle)
-        if self.direction == [0, -self.cell_size]:  # Si va vers le haut, droite = droite
-            check_x = head_x + self.cell_size
-            check_y = head_y
-        elif self.direction == [self.cell_size, 0]:  # Si va vers la droite, droite = bas
-            check_x = head_x
-            check_y = head_y + self.cell_size
-        elif self.direction == [0, self.cell_size]:  # Si va vers le bas, droite = gauche
-            check_x = head_x - self.cell_size
-            check_y = head_y
-        else:  # Si va vers la gauche, droite = haut
-            check_x = head_x
-            check_y = head_y - self.cell_size
-        
-        state[5] = 1 if (check_x < 0 or check_x >= self.width or 
-                         check_y < 0 or check_y >= self.height or
-                         [check_x, check_y] in self.snake) else 0
-        
-        # Vérifier danger à gauche (relatif à la direction actuelle)
-        if self.direction == [0, -self.cell_size]:  # Si va vers le haut, gauche = gauche
-            check_x = head_x - self.cell_size
-            check_y = head_y
-        elif self.direction == [self.cell_size, 0]:  # Si va vers la droite, gauche = haut
-            check_x = head_x
-            check_y = head_y - self.cell_size
-        elif self.direction == [0, self.cell_size]:  # Si va vers le bas, gauche = droite
-            check_x = head_x + self.cell_size
-            check_y = head_y
-        else:  # Si va vers la gauche, gauche = bas
-            check_x = head_x
-            check_y = head_y + self.cell_size
-        
-        state[6] = 1 if (check_x < 0 or check_x >= self.width or 
-                         check_y < 0 or check_y >= self.height or
-                         [check_x, check_y] in self.snake) else 0
+        out[direction] = 1
+        
+        # Danger immédiat (1 si danger, 0 sinon) devant, à droite et à gauche
+        # (la droite et la gauche sont relatives à la direction actuelle)
+        front, right, left = self.DANGER_DIRECTIONS[direction]
+        cell = neighbors[head * 4 + front]
+        out[4] = cell < 0 or occupied[cell]
+        cell = neighbors[head * 4 + right]
+        out[5] = cell < 0 or occupied[cell]
+        cell = neighbors[head * 4 + left]
+        out[6] = cell < 0 or occupied[cell]
         
         # Direction de la nourriture par rapport à la tête
-        state[7] = 1 if food_x < head_x else 0  # Nourriture à gauche
-        state[8] = 1 if food_x > head_x else 0  # Nourriture à droite
-        state[9] = 1 if food_y < head_y else 0  # Nourriture en haut
-        state[10] = 1 if food_y > head_y else 0  # Nourriture en bas
+        head_x, head_y = self._cell_x[head], self._cell_y[head]
+        food_x, food_y = self._cell_x[food], self._cell_y[food]
+        out[7] = food_x < head_x  # Nourriture à gauche
+        out[8] = food_x > head_x  # Nourriture à droite
+        out[9] = food_y < head_y  # Nourriture en haut
+        out[10] = food_y > head_y  # Nourriture en bas
         
         # Longueur du serpent (normalisée)
-        state[11] = len(self.snake) / (grid_width * grid_height)
+        out[11] = len(self.body) / self.num_cells
         
-        return state
+        return out
     
-    def step(self, action):
+    def step(self, action, out=None):
         """
         Exécute une action et retourne l'état suivant, la récompense,
         et un booléen indiquant si l'épisode est terminé.
         
         action: 0 (haut), 1 (droite), 2 (bas), 3 (gauche)
+        out: tampon optionnel pour l'état suivant (voir get_state)
         """
-        # Convertir l'action en direction
-        if action == self.UP:
-            new_direction = [0, -self.cell_size]
-        elif action == self.RIGHT:
-            new_direction = [self.cell_size, 0]
-        elif action == self.DOWN:
-            new_direction = [0, self.cell_size]
-        elif action == self.LEFT:
-            new_direction = [-self.cell_size, 0]
-        else:
+        if action not in (self.UP, self.RIGHT, self.DOWN, self.LEFT):
             raise ValueError(f"Action invalide: {action}")
         
         # Empêcher le serpent de faire demi-tour
-        if (new_direction[0] != -self.direction[0] or 
-            new_direction[1] != -self.direction[1]):
-            self.direction = new_direction
+        if action != (self._direction + 2) % 4:
+            self._direction = int(action)
         
         # Récompense par défaut (légèrement négative pour encourager l'efficacité)
         reward = self.REWARD_STEP
+        self.steps += 1
         self.steps_without_food += 1
         
-        # Calcule la nouvelle position de la tête
-        head_x, head_y = self.snake[0]
-        new_x = head_x + self.direction[0]
-        new_y = head_y + self.direction[1]
-        new_head = [new_x, new_y]
+        # Calcule la nouvelle position de la tête (-1 si hors du plateau)
+        new_head = self._neighbors[self.body[0] * 4 + self._direction]
         
         # Vérifie collision avec les bords ou avec soi-même
-        if (new_x < 0 or new_x >= self.width or 
-            new_y < 0 or new_y >= self.height or
-            new_head in self.snake or
+        if (new_head < 0 or self.occupied[new_head] or
             self.steps_without_food >= self.max_steps_without_food):
             self.game_over = True
-            return self.get_state(), self.REWARD_DEATH, True
+            return self.get_state(out), self.REWARD_DEATH, True
         
         # Ajoute la nouvelle tête
-        self.snake.insert(0, new_head)
+        self.body.appendleft(new_head)
+        self._occupy(new_head)
+        tail = -1
         
         # Vérifie si le serpent a mangé
-        if new_head[0] == self.food[0] and new_head[1] == self.food[1]:
+        if new_head == self.food_cell:
             self.score += 1
             self.steps_without_food = 0
             reward = self.REWARD_FOOD
             self.generate_food()
+            
+            # Plateau plein: l'épisode se termine par une victoire
+            if self.food_cell < 0:
+                self.won = True
+                self.game_over = True
         else:
             # Retire la queue si pas mangé
-            self.snake.pop()
+            tail = self.body.pop()
+            self._release(tail)
         
-        return self.get_state(), reward, self.game_over
+        # Plateau déjà vu depuis la dernière nourriture : le serpent tourne en rond
+        if self.loop_detection is not None and not self.game_over:
+            if self._track_board(new_head, tail):
+                self.loops += 1
+                if self.loop_detection == 'end':
+                    self.game_over = True
+                    return self.get_state(out), self.REWARD_DEATH, True
+                reward = self.REWARD_LOOP
+        
+        return self.get_state(out), reward, self.game_over
     
     def render(self):
         """
         Méthode optionnelle pour afficher le jeu (à implémenter si besoin de visualisation)
         Pourrait utiliser matplotlib ou autre bibliothèque de visualisation
         """
-        pass
\ No newline at end of file
+        pass
+
+class VecSnakeGame:
+    """
+    Version vectorisée de SnakeGame : simule N plateaux en parallèle dans des
+    tableaux NumPy et les fait avancer d'un pas en un seul appel.
+    
+    Les règles (pas de demi-tour, max_steps_without_food, récompenses REWARD_*)
+    sont les mêmes que celles de SnakeGame. Les plateaux terminés sont
+    réinitialisés automatiquement à la fin de step().
+    """
+    # Causes de fin d'épisode (end_causes)
+    END_WALL = 0
+    END_SELF = 1
+    END_TIMEOUT = 2
+    END_WON = 3
+    END_CAUSES = ('wall', 'self', 'timeout', 'won')
+    
+    def __init__(self, num_envs, width, height, cell_size, seed=None):
+        self.num_envs = num_envs
+        self.width = width
+        self.height = height
+        self.cell_size = cell_size
+        self.grid_width = width // cell_size
+        self.grid_height = height // cell_size
+        self.num_cells = self.grid_width * self.grid_height
+        self.max_steps_without_food = 100  # Pour éviter les boucles infinies
+        self.rng = np.random.default_rng(seed)
+        
+        # Grille d'occupation par plateau (1 si un segment du serpent occupe la case)
+        self.occupied = np.zeros((num_envs, self.num_cells), dtype=np.uint8)
+        # Corps de chaque serpent stocké dans un tampon circulaire d'indices de cases
+        self.body = np.zeros((num_envs, self.num_cells), dtype=np.int64)
+        self.head_ptr = np.zeros(num_envs, dtype=np.int64)
+        self.length = np.zeros(num_envs, dtype=np.int64)
+        self.direction = np.zeros(num_envs, dtype=np.int64)
+        self.food = np.zeros(num_envs, dtype=np.int64)
+        self.score = np.zeros(num_envs, dtype=np.int64)
+        self.steps_without_food = np.zeros(num_envs, dtype=np.int64)
+        self.steps = np.zeros(num_envs, dtype=np.int64)  # Pas joués dans l'épisode en cours
+        # Index des cases libres par plateau (même principe que SnakeGame)
+        self.free = np.zeros((num_envs, self.num_cells), dtype=np.int64)
+        self.free_pos = np.zeros((num_envs, self.num_cells), dtype=np.int64)
+        self.num_free = np.zeros(num_envs, dtype=np.int64)
+        
+        # Informations sur les plateaux terminés au dernier pas (valides là où dones est vrai)
+        self.final_scores = np.zeros(num_envs, dtype=np.int64)
+        self.final_steps = np.zeros(num_envs, dtype=np.int64)
+        self.end_causes = np.zeros(num_envs, dtype=np.int8)
+        self.won = np.zeros(num_envs, dtype=bool)
+        self.terminal_states = np.zeros((num_envs, SnakeGame.STATE_SIZE), dtype=np.float32)
+        
+        # Tables précalculées pour l'encodage des états
+        self.neighbors = build_neighbor_table(self.grid_width, self.grid_height)
+        self._danger_directions = np.array(SnakeGame.DANGER_DIRECTIONS)
+        self._all = np.arange(num_envs)
+        self.reset()
+    
+    def reset(self, out=None):
+        """Réinitialise tous les plateaux et retourne les états initiaux (N, STATE_SIZE)"""
+        self._reset_boards(self._all)
+        return self._compute_states(self._all, out)
+    
+    def _reset_boards(self, idx):
+        # Position initiale du serpent (au centre), direction initiale: droite
+        center = (self.grid_height // 2) * self.grid_width + self.grid_width // 2
+        self.occupied[idx] = 0
+        self.free[idx] = np.arange(self.num_cells)
+        self.free_pos[idx] = np.arange(self.num_cells)
+        self.num_free[idx] = self.num_cells
+        self.head_ptr[idx] = 0
+        self.body[idx, 0] = center
+        self._occupy(idx, np.full(len(idx), center))
+        self.length[idx] = 1
+        self.direction[idx] = SnakeGame.RIGHT
+        self.score[idx] = 0
+        self.steps_without_food[idx] = 0
+        self.steps[idx] = 0
+        self._place_food(idx)
+    
+    def _occupy(self, idx, cells):
+        """Occupe une case par plateau idx et la retire de l'index des cases libres"""
+        self.occupied[idx, cells] = 1
+        pos = self.free_pos[idx, cells]
+        last_pos = self.num_free[idx] - 1
+        last = self.free[idx, last_pos]
+        self.free[idx, pos] = last
+        self.free_pos[idx, last] = pos
+        self.free[idx, last_pos] = cells
+        self.free_pos[idx, cells] = last_pos
+        self.num_free[idx] = last_pos
+    
+    def _release(self, idx, cells):
+        """Libère une case par plateau idx et la remet dans l'index des cases libres"""
+        self.occupied[idx, cells] = 0
+        pos = self.free_pos[idx, cells]
+        first_pos = self.num_free[idx]
+        first = self.free[idx, first_pos]
+        self.free[idx, pos] = first
+        self.free_pos[idx, first] = pos
+        self.free[idx, first_pos] = cells
+        self.free_pos[idx, cells] = first_pos
+        self.num_free[idx] = first_pos + 1
+    
+    def _place_food(self, idx):
+        # Tirage uniforme parmi les cases libres, -1 si le plateau est plein
+        num_free = self.num_free[idx]
+        pick = (self.rng.random(len(idx)) * num_free).astype(np.int64)
+        food = self.free[idx, np.minimum(pick, self.num_cells - 1)]
+        self.food[idx] = np.where(num_free > 0, food, -1)
+    
+    def _compute_states(self, idx, out=None):
+        """
+        Calcule les états (même encodage que SnakeGame.get_state) des plateaux idx
+        dans out, de forme (len(idx), STATE_SIZE), alloué si absent.
+        """
+        if out is None:
+            out = np.empty((len(idx), SnakeGame.STATE_SIZE), dtype=np.float32)
+        rows = np.arange(len(idx))
+        direction = self.direction[idx]
+        head = self.body[idx, self.head_ptr[idx]]
+        
+        out.fill(0)
+        
+        # Direction du serpent (one-hot encoding)
+        out[rows, direction] = 1
+        
+        # Danger devant, à droite et à gauche (relatif à la direction actuelle)
+        cells = self.neighbors[head[:, None], self._danger_directions[direction]]
+        out[:, 4:7] = (cells < 0) | (self.occupied[idx[:, None], cells] != 0)
+        
+        # Direction de la nourriture par rapport à la tête
+        gw = self.grid_width
+        food = np.where(self.food[idx] >= 0, self.food[idx], head)
+        head_x, head_y = head % gw, head // gw
+        food_x, food_y = food % gw, food // gw
+        out[:, 7] = food_x < head_x
+        out[:, 8] = food_x > head_x
+        out[:, 9] = food_y < head_y
+        out[:, 10] = food_y > head_y
+        
+        # Longueur du serpent (normalisée)
+        out[:, 11] = self.length[idx] / self.num_cells
+        return out
+    
+    def step(self, actions, out=None):
+        """
+        Exécute une action par plateau et retourne (states, rewards, dones).
+        
+        actions: tableau de N entiers parmi 0 (haut), 1 (droite), 2 (bas), 3 (gauche)
+        out: tampon float32 optionnel de forme (N, STATE_SIZE) pour les états
+        
+        Pour les plateaux terminés, states contient déjà l'état initial de
+        l'épisode suivant ; l'état final, le score et le nombre de pas sont
+        disponibles dans terminal_states, final_scores et final_steps, won
+        indique les victoires (plateau rempli) et end_causes la cause de fin
+        (END_WALL, END_SELF, END_TIMEOUT ou END_WON).
+        """
+        actions = np.asarray(actions, dtype=np.int64)
+        if actions.shape != (self.num_envs,):
+            raise ValueError(f"Forme d'actions invalide: {actions.shape}")
+        if actions.min() < 0 or actions.max() > 3:
+            raise ValueError(f"Action invalide: {actions}")
+        
+        # Empêcher le serpent de faire demi-tour
+        self.direction = np.where(actions == (self.direction + 2) % 4, self.direction, actions)
+        self.steps_without_food += 1
+        self.steps += 1
+        
+        # Calcule la nouvelle position de la tête (-1 si hors du plateau)
+        head = self.body[self._all, self.head_ptr]
+        new_head = self.neighbors[head, self.direction]
+        
+        # Vérifie collision avec les bords ou avec soi-même
+        dones = ((new_head < 0) | (self.occupied[self._all, new_head] != 0) |
+                 (self.steps_without_food >= self.max_steps_without_food))
+        
+        rewards = np.full(self.num_envs, SnakeGame.REWARD_STEP, dtype=np.float32)
+        rewards[dones] = SnakeGame.REWARD_DEATH
+        
+        # Ajoute la nouvelle tête sur les plateaux encore en vie
+        alive = np.flatnonzero(~dones)
+        heads = new_head[alive]
+        self.head_ptr[alive] = (self.head_ptr[alive] - 1) % self.num_cells
+        self.body[alive, self.head_ptr[alive]] = heads
+        self._occupy(alive, heads)
+        
+        # Retire la queue si pas mangé
+        ate = heads == self.food[alive]
+        movers = alive[~ate]
+        tail_ptr = (self.head_ptr[movers] + self.length[movers]) % self.num_cells
+        self._release(movers, self.body[movers, tail_ptr])
+        
+        # Plateaux où le serpent a mangé
+        eaters = alive[ate]
+        self.length[eaters] += 1
+        self.score[eaters] += 1
+        self.steps_without_food[eaters] = 0
+        rewards[eaters] = SnakeGame.REWARD_FOOD
+        self._place_food(eaters)
+        
+        # Plateau plein: l'épisode se termine par une victoire
+        self.won[:] = False
+        self.won[eaters[self.food[eaters] < 0]] = True
+        dones |= self.won
+        
+        states = self._compute_states(self._all, out)
+        
+        # Réinitialisation automatique des plateaux terminés
+        finished = np.flatnonzero(dones)
+        if len(finished):
+            self.terminal_states[finished] = states[finished]
+            self.final_scores[finished] = self.score[finished]
+            self.final_steps[finished] = self.steps[finished]
+            # Cause de fin : les plateaux perdus n'ont pas bougé, la case visée est encore lisible
+            heads = new_head[finished]
+            self.end_causes[finished] = np.where(
+                self.won[finished], self.END_WON,
+                np.where(heads < 0, self.END_WALL,
+                         np.where(self.occupied[finished, heads] != 0, self.END_SELF, self.END_TIMEOUT)))
+            self._reset_boards(finished)
+            states[finished] = self._compute_states(finished)
+        
+        return states, rewards, dones
@@ -0,0 +1,190 @@
+import argparse
+import csv
+import os
+import numpy as np
+
+class RollingWindow:
+    """Fenêtre glissante de taille fixe : moyenne en O(1) sur les size dernières valeurs"""
+    def __init__(self, size=100):
+        self.size = size
+        self._values = np.zeros(size)
+        self._count = 0
+        self._sum = 0.0
+    
+    def append(self, value):
+        i = self._count % self.size
+        if self._count >= self.size:
+            self._sum -= self._values[i]
+        self._values[i] = value
+        self._sum += value
+        self._count += 1
+    
+    def __len__(self):
+        return min(self._count, self.size)
+    
+    def mean(self):
+        n = len(self)
+        return self._sum / n if n else 0.0
+    
+    def values(self):
+        """Valeurs de la fenêtre, de la plus ancienne à la plus récente"""
+        if self._count <= self.size:
+            return self._values[:self._count].tolist()
+        start = self._count % self.size
+        return np.concatenate((self._values[start:], self._values[:start])).tolist()
+
+class MetricsLog:
+    """
+    Journal de métriques d'entraînement en ajout seul (CSV, une ligne par
+    épisode, écrite immédiatement) avec statistiques glissantes incrémentales :
+    la mémoire utilisée ne dépend pas de la durée de l'entraînement.
+    """
+    FIELDS = ('episode', 'score', 'reward', 'steps', 'epsilon', 'avg_score')
+    
+    def __init__(self, path, window=100, resume=False):
+        """
+        Sans resume, un nouveau journal remplace celui d'un entraînement
+        précédent ; avec resume, les épisodes sont ajoutés à la suite.
+        """
+        self.path = path
+        self.scores = RollingWindow(window)
+        self.max_score = 0
+        self.episodes = 0
+        new_file = not resume or not os.path.exists(path) or os.path.getsize(path) == 0
+        self._file = open(path, 'w' if new_file else 'a', newline='')
+        self._writer = csv.writer(self._file)
+        if new_file:
+            self._writer.writerow(self.FIELDS)
+    
+    def append(self, episode, score, reward, steps, epsilon):
+        """Ajoute un épisode au journal et retourne le score moyen glissant"""
+        self.scores.append(score)
+        self.max_score = max(self.max_score, score)
+        self.episodes += 1
+        avg_score = self.scores.mean()
+        self._writer.writerow((episode, score, f'{reward:.2f}', steps, f'{epsilon:.5f}', f'{avg_score:.3f}'))
+        self._file.flush()
+        return avg_score
+    
+    def truncate(self, episode):
+        """Retire du fichier les lignes des épisodes postérieurs à episode (reprise)"""
+        self._file.close()
+        tmp_path = self.path + '.tmp'
+        with open(self.path, newline='') as src, open(tmp_path, 'w', newline='') as dst:
+            reader = csv.reader(src)
+            writer = csv.writer(dst)
+            writer.writerow(self.FIELDS)
+            next(reader, None)  # En-tête
+            writer.writerows(row for row in reader if int(row[0]) <= episode)
+        os.replace(tmp_path, self.path)
+        self._file = open(self.path, 'a', newline='')
+        self._writer = csv.writer(self._file)
+    
+    def close(self):
+        self._file.close()
+
+def read_metrics(path):
+    """Lit le journal paresseusement : un dictionnaire de valeurs numériques par épisode"""
+    with open(path, newline='') as f:
+        for row in csv.DictReader(f):
+            yield {key: float(value) for key, value in row.items()}
+
+class _Downsampler:
+    """
+    Réduit une série de longueur inconnue à au plus max_points points (moyenne
+    par paquets) en mémoire constante : quand le tampon est plein, les paquets
+    sont fusionnés deux à deux et leur taille double.
+    """
+    def __init__(self, max_points=2000):
+        self.max_points = max_points
+        self.bucket = 1
+        self.xs = []
+        self.ys = []
+        self._x_sum = 0.0
+        self._y_sum = 0.0
+        self._n = 0
+    
+    def add(self, x, y):
+        self._x_sum += x
+        self._y_sum += y
+        self._n += 1
+        if self._n == self.bucket:
+            self.xs.append(self._x_sum / self._n)
+            self.ys.append(self._y_sum / self._n)
+            self._x_sum = self._y_sum = 0.0
+            self._n = 0
+            if len(self.xs) == self.max_points:
+                self.xs = [(a + b) / 2 for a, b in zip(self.xs[0::2], self.xs[1::2])]
+                self.ys = [(a + b) / 2 for a, b in zip(self.ys[0::2], self.ys[1::2])]
+                self.bucket *= 2
+    
+    def points(self):
+        xs, ys = list(self.xs), list(self.ys)
+        if self._n:
+            xs.append(self._x_sum / self._n)
+            ys.append(self._y_sum / self._n)
+        return xs, ys
+
+def plot_metrics(path, output, max_points=2000):
+    """
+    Trace les graphiques de progression à partir du journal, hors de la boucle
+    d'entraînement. Le journal est lu en flux et réduit à max_points points.
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    
+    scores = _Downsampler(max_points)
+    avg_scores = _Downsampler(max_points)
+    rewards = _Downsampler(max_points)
+    histogram = {}
+    for row in read_metrics(path):
+        scores.add(row['episode'], row['score'])
+        avg_scores.add(row['episode'], row['avg_score'])
+        rewards.add(row['episode'], row['reward'])
+        histogram[int(row['score'])] = histogram.get(int(row['score']), 0) + 1
+    
+    plt.figure(figsize=(15, 10))
+    
+    # Score par épisode
+    plt.subplot(2, 2, 1)
+    plt.plot(*scores.points())
+    plt.xlabel('Episode')
+    plt.ylabel('Score')
+    plt.title('Score par épisode')
+    
+    # Score moyen
+    plt.subplot(2, 2, 2)
+    plt.plot(*avg_scores.points())
+    plt.xlabel('Episode')
+    plt.ylabel('Score moyen (100 épisodes)')
+    plt.title('Score moyen')
+    
+    # Récompense par épisode
+    plt.subplot(2, 2, 3)
+    plt.plot(*rewards.points())
+    plt.xlabel('Episode')
+    plt.ylabel('Récompense totale')
+    plt.title('Récompense par épisode')
+    
+    # Distribution des scores
+    plt.subplot(2, 2, 4)
+    values = sorted(histogram)
+    plt.bar(values, [histogram[v] for v in values])
+    plt.xlabel('Score')
+    plt.ylabel('Fréquence')
+    plt.title('Distribution des scores')
+    
+    plt.tight_layout()
+    plt.savefig(output)
+    plt.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Graphiques de progression à partir d'un journal de métriques")
+    parser.add_argument('log', help="Journal CSV écrit pendant l'entraînement")
+    parser.add_argument('--output', default='snake_training_progress.png')
+    parser.add_argument('--max-points', type=int, default=2000)
+    args = parser.parse_args()
+    
+    plot_metrics(args.log, args.output, args.max_points)
+    print(f"Graphiques sauvegardés dans {args.output}")
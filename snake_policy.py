@@ -0,0 +1,277 @@
+import argparse
+import os
+import numpy as np
+
+# Clé entière d'un état de SnakeGame.get_state : direction (2 bits, depuis le one-hot),
+# dangers (3 bits), direction de la nourriture (4 bits), puis la longueur quantifiée
+STATE_KEY_WEIGHTS = np.array([0, 128, 256, 384, 1, 2, 4, 8, 16, 32, 64], dtype=np.float32)
+STATE_KEY_BITS = 9
+
+class NumpyPolicy:
+    """
+    Politique gloutonne évaluée en NumPy pur à partir des poids exportés d'un
+    DQNAgent (fichier .npz) : aucune dépendance à TensorFlow.
+    Même interface que DQNAgent pour le jeu : act(state) et act_batch(states).
+    """
+    def __init__(self, weights):
+        # weights: liste [kernel_0, bias_0, kernel_1, bias_1, ...] des couches denses
+        weights = [np.ascontiguousarray(w, dtype=np.float32) for w in weights]
+        self.layers = list(zip(weights[0::2], weights[1::2]))
+        self.state_size = self.layers[0][0].shape[0]
+        self.action_size = self.layers[-1][0].shape[1]
+        # Couches avec leur tampon de sortie, réutilisé par act() pour éviter toute allocation par coup
+        buffered = [(kernel, bias, np.empty(bias.shape, dtype=np.float32))
+                    for kernel, bias in self.layers]
+        self._hidden = buffered[:-1]
+        self._output = buffered[-1]
+    
+    @classmethod
+    def load(cls, name):
+        """Charge une politique exportée par DQNAgent.export_numpy"""
+        with np.load(name) as data:
+            num_layers = int(data['num_layers'])
+            weights = []
+            for i in range(num_layers):
+                weights.append(data[f'kernel_{i}'])
+                weights.append(data[f'bias_{i}'])
+        return cls(weights)
+    
+    @staticmethod
+    def save(name, weights):
+        """Sauvegarde des poids de couches denses au format .npz compact"""
+        arrays = {'num_layers': np.array(len(weights) // 2)}
+        for i in range(len(weights) // 2):
+            arrays[f'kernel_{i}'] = np.asarray(weights[2 * i], dtype=np.float32)
+            arrays[f'bias_{i}'] = np.asarray(weights[2 * i + 1], dtype=np.float32)
+        np.savez(name, **arrays)
+    
+    def get_weights(self):
+        """Poids sous la même forme que Keras : [kernel_0, bias_0, kernel_1, bias_1, ...]"""
+        return [w for layer in self.layers for w in layer]
+    
+    def q_values(self, states):
+        """Valeurs Q d'un batch d'états (N, state_size) -> (N, action_size)"""
+        x = np.asarray(states, dtype=np.float32)
+        last = len(self.layers) - 1
+        for i, (kernel, bias) in enumerate(self.layers):
+            x = x @ kernel
+            x += bias
+            if i < last:
+                np.maximum(x, 0, out=x)  # Activation ReLU des couches cachées
+        return x
+    
+    def act(self, state, training=False):
+        """Action gloutonne pour un seul état (training est ignoré, pas d'exploration)"""
+        x = state if state.dtype == np.float32 else state.astype(np.float32)
+        for kernel, bias, out in self._hidden:
+            np.dot(x, kernel, out=out)
+            np.add(out, bias, out=out)
+            np.maximum(out, 0, out=out)
+            x = out
+        kernel, bias, out = self._output
+        np.dot(x, kernel, out=out)
+        np.add(out, bias, out=out)
+        return int(out.argmax())
+    
+    def act_batch(self, states):
+        """Actions gloutonnes pour un batch d'états (N, state_size)"""
+        return self.q_values(states).argmax(axis=1)
+
+def pack_states(states, length_buckets=512):
+    """
+    Clés entières d'états (..., 12) : les 11 caractéristiques binaires sur 9
+    bits et la longueur normalisée (state[11]) arrondie sur length_buckets
+    niveaux. Deux longueurs différentes ont des clés différentes dès que
+    length_buckets est au moins le nombre de cases du plateau.
+    """
+    states = np.asarray(states, dtype=np.float32)
+    keys = (states[..., :11] @ STATE_KEY_WEIGHTS).astype(np.int64)
+    # Arrondi au supérieur des demis, en float64 : exactement le calcul de state_key
+    buckets = np.floor(states[..., 11].astype(np.float64) * length_buckets + 0.5)
+    buckets = np.minimum(buckets, length_buckets).astype(np.int64)
+    return keys + (buckets << STATE_KEY_BITS)
+
+def state_key(state, length_buckets=512):
+    """Clé d'un seul état, égale à celle de pack_states sans passer par un batch"""
+    bucket = min(int(float(state[11]) * length_buckets + 0.5), length_buckets)
+    return int(state[:11] @ STATE_KEY_WEIGHTS) + (bucket << STATE_KEY_BITS)
+
+class QCache:
+    """
+    Table dense des actions gloutonnes déjà calculées, indexée par
+    pack_states (environ 260 000 entrées, 1,3 Mo avec 512 niveaux de
+    longueur). Chaque entrée porte la génération où elle a été écrite :
+    invalidate() rend toute la table caduque en O(1), à chaque changement
+    des poids.
+    """
+    def __init__(self, length_buckets=512):
+        self.length_buckets = length_buckets
+        size = (length_buckets + 1) << STATE_KEY_BITS
+        self.actions = np.zeros(size, dtype=np.int8)
+        self.generations = np.zeros(size, dtype=np.uint32)
+        self.generation = 1
+        self.hits = 0
+        self.misses = 0
+    
+    def invalidate(self):
+        self.generation += 1
+    
+    def key(self, state):
+        """Clé d'un seul état (state_key)"""
+        return state_key(state, self.length_buckets)
+    
+    def get(self, key):
+        """Action en cache pour key, ou -1 si elle est absente ou caduque"""
+        if self.generations[key] == self.generation:
+            self.hits += 1
+            return int(self.actions[key])
+        self.misses += 1
+        return -1
+    
+    def put(self, key, action):
+        self.actions[key] = action
+        self.generations[key] = self.generation
+    
+    def act(self, state, compute):
+        """Action pour un état ; compute(state) n'est appelé qu'en l'absence de l'entrée"""
+        key = self.key(state)
+        action = self.get(key)
+        if action < 0:
+            action = int(compute(state))
+            self.put(key, action)
+        return action
+    
+    def act_batch(self, states, compute):
+        """Actions d'un batch ; compute(states) ne reçoit que les états absents du cache"""
+        keys = pack_states(states, self.length_buckets)
+        miss = self.generations[keys] != self.generation
+        actions = self.actions[keys].astype(np.int64)
+        num_misses = int(np.count_nonzero(miss))
+        if num_misses:
+            computed = compute(states[miss])
+            actions[miss] = computed
+            self.actions[keys[miss]] = computed
+            self.generations[keys[miss]] = self.generation
+        self.misses += num_misses
+        self.hits += len(keys) - num_misses
+        return actions
+    
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+class CachedPolicy:
+    """
+    Politique gloutonne (NumpyPolicy, DQNAgent...) dont les décisions sont
+    mémorisées dans un QCache : en évaluation et en jeu, le réseau n'est
+    évalué qu'une fois par état distinct. À invalider si les poids changent.
+    """
+    def __init__(self, policy, length_buckets=512):
+        self.policy = policy
+        self.state_size = policy.state_size
+        self.action_size = policy.action_size
+        self.cache = QCache(length_buckets)
+    
+    def invalidate(self):
+        self.cache.invalidate()
+    
+    def act(self, state, training=False):
+        return self.cache.act(state, lambda s: self.policy.act(s, training=False))
+    
+    def act_batch(self, states):
+        return self.cache.act_batch(states, self.policy.act_batch)
+
+def _layer_order(name):
+    # dense, dense_1, dense_2, ..., dense_10 : ordre de création des couches
+    base, _, suffix = name.rpartition('_')
+    return (base, int(suffix)) if suffix.isdigit() else (name, 0)
+
+def read_keras_weights(name):
+    """
+    Lit les poids des couches denses d'un fichier sauvegardé par
+    model.save_weights, avec h5py seul (sans importer TensorFlow). Les formats
+    .h5 de tf.keras 2 (attribut layer_names) et .weights.h5 de Keras 3
+    (groupe layers/<nom>/vars) sont reconnus.
+    """
+    import h5py
+    weights = []
+    with h5py.File(name, 'r') as f:
+        if 'layer_names' in f.attrs:
+            for layer_name in f.attrs['layer_names']:
+                group = f[layer_name.decode() if isinstance(layer_name, bytes) else layer_name]
+                for weight_name in group.attrs['weight_names']:
+                    weights.append(group[weight_name.decode() if isinstance(weight_name, bytes) else weight_name][()])
+        else:
+            layers = f['layers']
+            for layer_name in sorted(layers, key=_layer_order):
+                variables = layers[layer_name]['vars']
+                weights.extend(variables[key][()] for key in sorted(variables, key=int))
+    if not weights or len(weights) % 2:
+        raise ValueError(f"{name} ne contient pas les poids d'un réseau de couches denses")
+    return weights
+
+def keras3_weights_name(name):
+    """Nom imposé par model.save_weights de Keras 3 : snake_model.h5 -> snake_model.weights.h5"""
+    if name.endswith('.weights.h5'):
+        return name
+    return os.path.splitext(name)[0] + '.weights.h5'
+
+def find_keras_weights(name):
+    """Fichier de poids Keras à lire pour name : name lui-même, sinon sa variante .weights.h5"""
+    if not os.path.exists(name) and os.path.exists(keras3_weights_name(name)):
+        return keras3_weights_name(name)
+    return name
+
+def load_policy(model_path, state_size=12, action_size=4, cache=False):
+    """
+    Charge une politique pour jouer, sans TensorFlow si possible : NumpyPolicy
+    pour un fichier .npz ou pour des poids Keras lisibles avec h5py, sinon un
+    DQNAgent d'inférence (non compilé) dont les poids sont lus par Keras. Une
+    table Q sauvegardée par TabularAgent (.npz de type 'tabular') est jouée
+    telle quelle ; elle est aussi trouvée sous le nom Keras correspondant
+    (snake_model_best.h5 -> snake_model_best.npz). FileNotFoundError si aucun
+    fichier ne correspond.
+    Avec cache, les décisions sont mémorisées par état (CachedPolicy).
+    """
+    policy = _load_policy(model_path, state_size, action_size)
+    return CachedPolicy(policy) if cache else policy
+
+def _load_policy(model_path, state_size, action_size):
+    if not model_path.endswith('.npz'):
+        model_path = find_keras_weights(model_path)
+        if not os.path.exists(model_path):
+            # TabularAgent écrit sa table en .npz sous le même nom (snake_model.h5 -> snake_model.npz)
+            from snake_tabular import npz_path
+            if not os.path.exists(npz_path(model_path)):
+                raise FileNotFoundError(f"Aucun modèle {model_path} (ni {npz_path(model_path)})")
+            model_path = npz_path(model_path)
+    
+    if model_path.endswith('.npz'):
+        with np.load(model_path) as data:
+            kind = str(data['kind']) if 'kind' in data.files else 'mlp'
+        if kind == 'tabular':
+            from snake_tabular import TabularAgent
+            return TabularAgent.from_file(model_path)
+        return NumpyPolicy.load(model_path)
+    
+    try:
+        return NumpyPolicy(read_keras_weights(model_path))
+    except (ImportError, OSError, KeyError, ValueError):
+        pass  # h5py absent ou format inattendu : lecture par Keras
+    
+    from snake_dqn_agent import DQNAgent
+    agent = DQNAgent(state_size, action_size, inference_only=True)
+    agent.load(model_path)
+    agent.epsilon = 0  # Pas d'exploration
+    return agent
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Exporte un modèle DQN Keras vers une politique NumPy (.npz)")
+    parser.add_argument('model', help="Poids Keras sauvegardés par DQNAgent.save")
+    parser.add_argument('output', help="Fichier .npz à créer")
+    args = parser.parse_args()
+    
+    policy = load_policy(args.model)
+    weights = policy.get_weights() if isinstance(policy, NumpyPolicy) else policy.model.get_weights()
+    NumpyPolicy.save(args.output, weights)
+    print(f"Politique NumPy exportée dans {args.output}")
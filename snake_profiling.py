@@ -0,0 +1,147 @@
+import json
+import os
+import sys
+import time
+from contextlib import nullcontext
+
+def rss_bytes():
+    """Mémoire résidente actuelle du processus (pic si /proc n'est pas disponible)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+class _Phase:
+    """Chronomètre réutilisable d'une phase (context manager)"""
+    __slots__ = ('times', 'name', 'start')
+    
+    def __init__(self, times, name):
+        self.times = times
+        self.name = name
+        self.start = 0.0
+    
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+    
+    def __exit__(self, *exc):
+        self.times[self.name] = self.times.get(self.name, 0.0) + time.perf_counter() - self.start
+        return False
+
+class TrainingProfiler:
+    """
+    Instrumentation de la boucle d'entraînement : temps passé par phase
+    (env.step, agent.act, agent.replay, rendu, sauvegardes...), compteurs et
+    échantillons de mémoire résidente. Chaque épisode produit une ligne JSON
+    dans log_path ; les enregistrements restent interrogeables via records
+    et summary() à la fin de l'entraînement.
+    """
+    def __init__(self, log_path=None, memory_every=10):
+        self.log_path = log_path
+        self.memory_every = memory_every  # Échantillonnage de la mémoire tous les N épisodes
+        self.records = []
+        self._episode_times = {}
+        self._episode_counters = {}
+        self._phases = {}
+        self._episode_start = time.perf_counter()
+        self._log = open(log_path, 'a') if log_path else None
+    
+    def phase(self, name):
+        """Context manager chronométrant une phase : with profiler.phase('replay'): ..."""
+        timer = self._phases.get(name)
+        if timer is None:
+            timer = self._phases[name] = _Phase(self._episode_times, name)
+        return timer
+    
+    def count(self, name, n=1):
+        """Incrémente un compteur (pas d'environnement, mises à jour du gradient...)"""
+        self._episode_counters[name] = self._episode_counters.get(name, 0) + n
+    
+    def end_episode(self, episode, **fields):
+        """Clôt les mesures de l'épisode, les écrit dans le journal et les conserve"""
+        now = time.perf_counter()
+        record = {
+            'episode': episode,
+            'wall_time': now - self._episode_start,
+            'phases': dict(self._episode_times),
+            'counters': dict(self._episode_counters)
+        }
+        if self.memory_every and episode % self.memory_every == 0:
+            record['rss_bytes'] = rss_bytes()
+        record.update(fields)
+        self.records.append(record)
+        if self._log is not None:
+            self._log.write(json.dumps(record) + '\n')
+            self._log.flush()
+        self._episode_times.clear()
+        self._episode_counters.clear()
+        self._episode_start = now
+    
+    def summary(self):
+        """Totaux sur l'entraînement : temps et part de chaque phase, compteurs, mémoire"""
+        wall_time = sum(r['wall_time'] for r in self.records)
+        phases = {}
+        counters = {}
+        for record in self.records:
+            for name, seconds in record['phases'].items():
+                phases[name] = phases.get(name, 0.0) + seconds
+            for name, n in record['counters'].items():
+                counters[name] = counters.get(name, 0) + n
+        rss = [r['rss_bytes'] for r in self.records if 'rss_bytes' in r]
+        return {
+            'episodes': len(self.records),
+            'wall_time': wall_time,
+            'phases': {name: {'seconds': seconds, 'share': seconds / wall_time if wall_time else 0.0}
+                       for name, seconds in sorted(phases.items(), key=lambda item: -item[1])},
+            'counters': counters,
+            'rss_first_bytes': rss[0] if rss else None,
+            'rss_last_bytes': rss[-1] if rss else None,
+            'rss_peak_bytes': max(rss) if rss else None
+        }
+    
+    def print_summary(self):
+        summary = self.summary()
+        print(f"Profil sur {summary['episodes']} épisodes ({summary['wall_time']:.1f} s):")
+        for name, phase in summary['phases'].items():
+            print(f"  {name:<12} {phase['seconds']:>9.2f} s  {phase['share']:>6.1%}")
+        for name, n in summary['counters'].items():
+            print(f"  {name:<12} {n:>9d}")
+        if summary['rss_last_bytes'] is not None:
+            print(f"  RSS: {summary['rss_first_bytes'] / 2**20:.0f} Mo -> {summary['rss_last_bytes'] / 2**20:.0f} Mo "
+                  f"(pic {summary['rss_peak_bytes'] / 2**20:.0f} Mo)")
+    
+    def close(self):
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+
+class NullProfiler:
+    """Profiler désactivé : mêmes méthodes que TrainingProfiler, sans aucun travail"""
+    _phase = nullcontext()
+    records = []
+    
+    def phase(self, name):
+        return self._phase
+    
+    def count(self, name, n=1):
+        pass
+    
+    def end_episode(self, episode, **fields):
+        pass
+    
+    def summary(self):
+        return {}
+    
+    def print_summary(self):
+        pass
+    
+    def close(self):
+        pass
+
+def load_profile(log_path):
+    """Relit un journal de profilage écrit par TrainingProfiler (une ligne JSON par épisode)"""
+    with open(log_path) as f:
+        return [json.loads(line) for line in f if line.strip()]
@@ -0,0 +1,217 @@
+import argparse
+import os
+import struct
+from collections import namedtuple
+import numpy as np
+from snake_logic import SnakeGame
+
+# En-tête du fichier : signature, version, plateau et limite de pas sans nourriture (0 = aucune)
+MAGIC = b'SNKR'
+VERSION = 1
+HEADER = struct.Struct('<4sHHHHI')
+# En-tête de bloc : nombre d'épisodes et taille des données
+CHUNK_HEADER = struct.Struct('<II')
+# En-tête d'épisode : numéro, graine, nombre de pas, score (suivi des actions, 2 bits par pas)
+EPISODE_HEADER = struct.Struct('<IQII')
+
+Trajectory = namedtuple('Trajectory', 'episode seed score actions')
+
+def pack_actions(actions):
+    """Compacte une suite d'actions (0 à 3) sur 2 bits chacune : 4 actions par octet"""
+    a = np.zeros((len(actions) + 3) // 4 * 4, dtype=np.uint8)
+    a[:len(actions)] = actions
+    a = a.reshape(-1, 4)
+    return (a[:, 0] | (a[:, 1] << 2) | (a[:, 2] << 4) | (a[:, 3] << 6)).tobytes()
+
+def unpack_actions(data, num_steps):
+    """Inverse de pack_actions"""
+    packed = np.frombuffer(data, dtype=np.uint8)
+    a = np.stack([(packed >> shift) & 3 for shift in (0, 2, 4, 6)], axis=1)
+    return a.ravel()[:num_steps]
+
+class TrajectoryRecorder:
+    """
+    Enregistre les épisodes joués sous forme de graine + actions compactées
+    (2 bits par pas) dans un fichier par blocs, en ajout seul. Pendant
+    l'épisode, record() ne fait qu'ajouter l'action à une liste ; la
+    compaction et l'écriture ont lieu tous les chunk_episodes épisodes.
+    
+    Utilisation :
+        recorder.start_episode(env.episode_seed)  # après env.reset()
+        recorder.record(action)                   # à chaque pas
+        recorder.end_episode(env.score)
+    """
+    def __init__(self, path, width, height, cell_size, max_steps_without_food=100, chunk_episodes=100):
+        self.path = path
+        self.chunk_episodes = chunk_episodes
+        header = HEADER.pack(MAGIC, VERSION, width, height, cell_size,
+                             int(max_steps_without_food) if np.isfinite(max_steps_without_food) else 0)
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            with open(path, 'rb') as f:
+                if f.read(HEADER.size) != header:
+                    raise ValueError(f"{path} a été enregistré avec d'autres paramètres de jeu")
+            self._file = open(path, 'ab')
+        else:
+            self._file = open(path, 'wb')
+            self._file.write(header)
+        self._chunk = bytearray()
+        self._chunk_count = 0
+        self._episode = 0
+        self._seed = None
+        self._actions = []
+    
+    @classmethod
+    def for_game(cls, path, env, chunk_episodes=100):
+        """Recorder configuré avec les dimensions et les règles de env"""
+        return cls(path, env.width, env.height, env.cell_size, env.max_steps_without_food, chunk_episodes)
+    
+    def start_episode(self, seed, episode=None):
+        self._seed = seed
+        self._episode = episode if episode is not None else self._episode + 1
+        self._actions.clear()
+    
+    def record(self, action):
+        self._actions.append(action)
+    
+    def end_episode(self, score):
+        actions = self._actions
+        self._chunk += EPISODE_HEADER.pack(self._episode, self._seed, len(actions), score)
+        self._chunk += pack_actions(actions)
+        self._chunk_count += 1
+        if self._chunk_count >= self.chunk_episodes:
+            self.flush()
+    
+    def flush(self):
+        """Écrit le bloc en cours"""
+        if self._chunk_count:
+            self._file.write(CHUNK_HEADER.pack(self._chunk_count, len(self._chunk)))
+            self._file.write(self._chunk)
+            self._file.flush()
+            self._chunk = bytearray()
+            self._chunk_count = 0
+    
+    def close(self):
+        self.flush()
+        self._file.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+
+class TrajectoryReader:
+    """
+    Lecture d'un fichier écrit par TrajectoryRecorder. L'ouverture ne lit que
+    les en-têtes de blocs ; les épisodes sont décodés à la demande.
+    """
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            magic, version, self.width, self.height, self.cell_size, max_steps = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"{path} n'est pas un enregistrement de trajectoires")
+            self.max_steps_without_food = max_steps or float('inf')
+            
+            # Index des blocs : (position des données, taille, nombre d'épisodes)
+            self._chunks = []
+            self._count = 0
+            while True:
+                raw = f.read(CHUNK_HEADER.size)
+                if len(raw) < CHUNK_HEADER.size:
+                    break
+                count, size = CHUNK_HEADER.unpack(raw)
+                self._chunks.append((f.tell(), size, count))
+                self._count += count
+                f.seek(size, os.SEEK_CUR)
+    
+    def __len__(self):
+        return self._count
+    
+    def __iter__(self):
+        with open(self.path, 'rb') as f:
+            for offset, size, count in self._chunks:
+                f.seek(offset)
+                data = f.read(size)
+                pos = 0
+                for _ in range(count):
+                    episode, seed, num_steps, score = EPISODE_HEADER.unpack_from(data, pos)
+                    pos += EPISODE_HEADER.size
+                    packed_size = (num_steps + 3) // 4
+                    actions = unpack_actions(data[pos:pos + packed_size], num_steps)
+                    pos += packed_size
+                    yield Trajectory(episode, seed, score, actions)
+    
+    def find(self, episode):
+        """Trajectoire de l'épisode numéro episode (None si absente)"""
+        for trajectory in self:
+            if trajectory.episode == episode:
+                return trajectory
+        return None
+    
+    def best(self):
+        """Trajectoire de meilleur score (la plus ancienne en cas d'égalité)"""
+        best = None
+        for trajectory in self:
+            if best is None or trajectory.score > best.score:
+                best = trajectory
+        return best
+    
+    def make_game(self):
+        """SnakeGame configuré comme celui de l'enregistrement"""
+        env = SnakeGame(self.width, self.height, self.cell_size)
+        env.max_steps_without_food = self.max_steps_without_food
+        return env
+
+def replay_trajectory(env, trajectory):
+    """
+    Rejoue une trajectoire dans env : génère env après la réinitialisation puis
+    après chaque pas. La simulation est identique à l'épisode enregistré.
+    """
+    env.reset(seed=trajectory.seed)
+    yield env
+    for action in trajectory.actions:
+        env.step(int(action))
+        yield env
+
+def play(path, episode=None, fps=15):
+    """Affiche avec pygame un épisode enregistré (par défaut le meilleur)"""
+    import pygame
+    from snake_renderer import GameView
+    
+    reader = TrajectoryReader(path)
+    trajectory = reader.find(episode) if episode is not None else reader.best()
+    if trajectory is None:
+        raise ValueError(f"Épisode {episode} absent de {path}")
+    
+    env = reader.make_game()
+    pygame.init()
+    view = GameView(env, f"Snake AI - épisode {trajectory.episode}")
+    clock = pygame.time.Clock()
+    
+    for env in replay_trajectory(env, trajectory):
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                pygame.quit()
+                return
+        view.draw(env)
+        clock.tick(fps)
+    
+    if env.score != trajectory.score:
+        print(f"Attention: score rejoué {env.score}, score enregistré {trajectory.score}")
+    pygame.time.wait(1000)
+    pygame.quit()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rejoue les épisodes enregistrés pendant l'entraînement")
+    parser.add_argument('recording', help="Fichier écrit par TrajectoryRecorder")
+    parser.add_argument('--episode', type=int, help="Numéro de l'épisode (par défaut le meilleur)")
+    parser.add_argument('--fps', type=int, default=15)
+    parser.add_argument('--list', action='store_true', help="Liste les épisodes sans les afficher")
+    args = parser.parse_args()
+    
+    if args.list:
+        for trajectory in TrajectoryReader(args.recording):
+            print(f"Episode: {trajectory.episode}, Score: {trajectory.score}, Steps: {len(trajectory.actions)}")
+    else:
+        play(args.recording, args.episode, args.fps)
@@ -0,0 +1,179 @@
+import pygame
+
+class TextCache:
+    """Surfaces de texte déjà rendues, par (texte, couleur)"""
+    def __init__(self, font, max_entries=512):
+        self.font = font
+        self.max_entries = max_entries
+        self._surfaces = {}
+    
+    def render(self, text, color):
+        key = (text, color)
+        surface = self._surfaces.get(key)
+        if surface is None:
+            if len(self._surfaces) >= self.max_entries:
+                self._surfaces.clear()  # Les textes numériques ne se répètent pas indéfiniment
+            surface = self._surfaces[key] = self.font.render(text, True, color)
+        return surface
+
+class Label:
+    """
+    Texte à position fixe : n'est redessiné que si son contenu change, et
+    retourne alors la zone modifiée (ancienne et nouvelle étendue).
+    """
+    def __init__(self, surface, pos, cache, background, center=False):
+        self.surface = surface
+        self.pos = pos
+        self.cache = cache
+        self.background = background
+        self.center = center
+        self._value = None
+        self._rect = None
+    
+    def set(self, text, color):
+        """Affiche text ; retourne le rectangle modifié, ou None si rien n'a changé"""
+        if (text, color) == self._value:
+            return None
+        self._value = (text, color)
+        rendered = self.cache.render(text, color)
+        rect = rendered.get_rect(center=self.pos) if self.center else rendered.get_rect(topleft=self.pos)
+        dirty = rect if self._rect is None else rect.union(self._rect)
+        if self._rect is not None:
+            self.surface.fill(self.background, self._rect)
+        self.surface.blit(rendered, rect)
+        self._rect = rect
+        return dirty
+    
+    def invalidate(self):
+        """Oublie le contenu affiché (après un effacement complet de la surface)"""
+        self._value = None
+        self._rect = None
+
+class BoardRenderer:
+    """
+    Dessine le plateau d'un SnakeGame en ne retraçant que les cases modifiées
+    depuis l'image précédente : nouvelle tête, ancienne queue et nourriture.
+    Le plateau est redessiné entièrement au premier pas d'un épisode ou si
+    des pas ont été sautés.
+    """
+    def __init__(self, surface, origin, cell_size, colors):
+        self.surface = surface
+        self.origin = origin
+        self.cell_size = cell_size
+        self.colors = colors  # 'bg', 'snake', 'food'
+        self._episode = None
+        self._steps = -1
+        self._head = self._tail = self._food = -1
+        self._grid_width = 1
+    
+    def cell_rect(self, cell):
+        size = self.cell_size
+        return pygame.Rect(self.origin[0] + (cell % self._grid_width) * size,
+                           self.origin[1] + (cell // self._grid_width) * size, size, size)
+    
+    def invalidate(self):
+        """Force un rendu complet à la prochaine mise à jour"""
+        self._episode = None
+    
+    def update(self, env):
+        """Met le plateau à jour et retourne la liste des rectangles modifiés"""
+        if env.episode_seed == self._episode and env.steps == self._steps:
+            return []
+        if env.episode_seed != self._episode or env.steps != self._steps + 1:
+            return [self.draw_full(env)]
+        
+        self._steps = env.steps
+        dirty = []
+        head, tail = env.body[0], env.body[-1]
+        if head != self._head:
+            dirty.append(self.surface.fill(self.colors['snake'], self.cell_rect(head)))
+        if tail != self._tail and not env.occupied[self._tail]:
+            dirty.append(self.surface.fill(self.colors['bg'], self.cell_rect(self._tail)))
+        if env.food_cell != self._food and env.food_cell >= 0:
+            dirty.append(self.surface.fill(self.colors['food'], self.cell_rect(env.food_cell)))
+        self._head, self._tail, self._food = head, tail, env.food_cell
+        return dirty
+    
+    def draw_full(self, env):
+        """Redessine tout le plateau et retourne son rectangle"""
+        self._grid_width = env.grid_width
+        self._episode = env.episode_seed
+        self._steps = env.steps
+        board = pygame.Rect(self.origin, (env.grid_width * self.cell_size, env.grid_height * self.cell_size))
+        self.surface.fill(self.colors['bg'], board)
+        if env.food_cell >= 0:
+            self.surface.fill(self.colors['food'], self.cell_rect(env.food_cell))
+        for cell in env.body:
+            self.surface.fill(self.colors['snake'], self.cell_rect(cell))
+        self._head, self._tail, self._food = env.body[0], env.body[-1], env.food_cell
+        return board
+
+class ScoreChart:
+    """Mini graphique des derniers scores, redessiné à la demande (fin d'épisode)"""
+    def __init__(self, surface, rect, font, colors, max_points=100):
+        self.surface = surface
+        self.rect = pygame.Rect(rect)
+        self.colors = colors  # 'chart_bg', 'chart_line', 'text'
+        self.max_points = max_points
+        self.title = font.render("Historique des scores", True, colors['text'])
+    
+    def draw(self, scores):
+        """Trace les max_points derniers scores et retourne le rectangle du graphique"""
+        rect = self.rect
+        pygame.draw.rect(self.surface, self.colors['chart_bg'], rect)
+        pygame.draw.rect(self.surface, self.colors['text'], rect, 1)
+        self.surface.blit(self.title, (rect.centerx - self.title.get_width() // 2, rect.y + 5))
+        
+        scores = scores[-self.max_points:]
+        if len(scores) > 1:
+            max_score = max(scores) if max(scores) > 0 else 1
+            step = rect.width / (len(scores) - 1)
+            points = [(rect.x + i * step, rect.bottom - (score / max_score) * (rect.height - 30))
+                      for i, score in enumerate(scores)]
+            pygame.draw.lines(self.surface, self.colors['chart_line'], False, points, 2)
+        return rect
+
+class GameView:
+    """
+    Fenêtre de jeu simple : une barre de score au-dessus du plateau. Chaque
+    appel à draw() n'envoie à l'écran que les zones modifiées.
+    """
+    HUD_HEIGHT = 40
+    COLORS = {
+        'bg': (0, 0, 0),
+        'snake': (0, 255, 0),
+        'food': (255, 0, 0),
+        'text': (255, 255, 255)
+    }
+    
+    def __init__(self, env, caption, colors=None, font_size=36):
+        self.colors = colors or self.COLORS
+        self.screen = pygame.display.set_mode((env.width, env.height + self.HUD_HEIGHT))
+        pygame.display.set_caption(caption)
+        self.board = BoardRenderer(self.screen, (0, self.HUD_HEIGHT), env.cell_size, self.colors)
+        self.text = TextCache(pygame.font.Font(None, font_size))  # Police propre à la fenêtre : pygame.quit() la détruit
+        self.score = Label(self.screen, (10, 10), self.text, self.colors['bg'])
+        self.board_center = (env.width // 2, self.HUD_HEIGHT + env.height // 2)
+        self._message = None
+        self.screen.fill(self.colors['bg'])
+        pygame.display.flip()
+    
+    def draw(self, env, message=None):
+        """Met à jour le plateau, le score et un message optionnel centré sur le plateau"""
+        if message != self._message:
+            if self._message is not None:
+                self.board.invalidate()  # Efface l'ancien message
+            self._message = message
+            show_message = message is not None
+        else:
+            show_message = False
+        
+        dirty = self.board.update(env)
+        rect = self.score.set(f"Score: {env.score}", self.colors['text'])
+        if rect is not None:
+            dirty.append(rect)
+        if self._message is not None and (show_message or dirty):
+            rendered = self.text.render(self._message, self.colors['text'])
+            dirty.append(self.screen.blit(rendered, rendered.get_rect(center=self.board_center)))
+        if dirty:
+            pygame.display.update(dirty)
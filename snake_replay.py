@@ -0,0 +1,397 @@
+import json
+import os
+import numpy as np
+
+class ReplayBuffer:
+    """
+    Mémoire d'expériences stockée dans des tableaux NumPy préalloués et contigus,
+    utilisée comme tampon circulaire avec un curseur d'écriture.
+    Le coût mémoire est d'environ 115 octets par transition (état de taille 12),
+    ce qui permet d'en conserver plusieurs millions.
+    
+    Avec n_step > 1, chaque transition tirée est complétée au moment du tirage
+    par les n - 1 suivantes du même épisode : la récompense retournée est
+    r_0 + gamma r_1 + ... + gamma^(k-1) r_(k-1), l'état suivant celui du k-ième
+    pas et discounts vaut gamma^k, où k <= n s'arrête à la fin de l'épisode ou
+    de la séquence enregistrée. links[i] est l'écart (en positions du tampon)
+    jusqu'à la transition suivante du même épisode, 0 si elle est inconnue.
+    """
+    def __init__(self, capacity, state_size, seed=None, n_step=1, gamma=0.95):
+        self.capacity = capacity
+        self.state_size = state_size
+        self.n_step = n_step
+        self.gamma = gamma
+        self.states = np.zeros((capacity, state_size), dtype=np.float32)
+        self.actions = np.zeros(capacity, dtype=np.int32)
+        self.rewards = np.zeros(capacity, dtype=np.float32)
+        self.next_states = np.zeros((capacity, state_size), dtype=np.float32)
+        self.dones = np.zeros(capacity, dtype=np.float32)
+        self.links = np.zeros(capacity, dtype=np.int32)
+        self.cursor = 0  # Prochaine position d'écriture
+        self.size = 0  # Nombre de transitions valides
+        self.rng = np.random.default_rng(seed)
+    
+    def __len__(self):
+        return self.size
+    
+    def add(self, state, action, reward, next_state, done):
+        """
+        Stocke une transition en écrasant la plus ancienne si le tampon est plein.
+        Les transitions ajoutées une à une forment une seule séquence : la
+        suivante est celle du pas d'après (ou le début de l'épisode suivant).
+        """
+        i = self.cursor
+        self.states[i] = state
+        self.actions[i] = action
+        self.rewards[i] = reward
+        self.next_states[i] = next_state
+        self.dones[i] = done
+        self.links[i] = 1
+        self.cursor = (i + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+    
+    def add_batch(self, states, actions, rewards, next_states, dones, stride=0):
+        """
+        Stocke un lot de transitions (par exemple un pas de VecSnakeGame) en une
+        seule écriture. stride est le nombre de séquences entrelacées dans le
+        lot : la transition i est suivie de la transition i + stride (par
+        exemple num_envs pas successifs de num_envs plateaux) ; 0 si les
+        transitions ne se suivent pas. Le lot suivant commence de nouvelles
+        séquences.
+        """
+        n = len(actions)
+        idx = (self.cursor + np.arange(n)) % self.capacity
+        self.states[idx] = states
+        self.actions[idx] = actions
+        self.rewards[idx] = rewards
+        self.next_states[idx] = next_states
+        self.dones[idx] = dones
+        self.links[idx] = 0
+        if stride:
+            self.links[idx[:-stride]] = stride
+        self.cursor = (self.cursor + n) % self.capacity
+        self.size = min(self.size + n, self.capacity)
+    
+    def sample(self, batch_size):
+        """
+        Tire batch_size transitions uniformément (avec remise) et retourne
+        (states, actions, rewards, next_states, dones) prêts pour le réseau.
+        """
+        idx = self.rng.integers(0, self.size, size=batch_size)
+        return self._gather(idx)
+    
+    def state_dict(self):
+        """Copie du contenu et de l'état du tampon (voir snake_checkpoint.py)"""
+        n = self.size
+        return {
+            'states': self.states[:n].copy(),
+            'actions': self.actions[:n].copy(),
+            'rewards': self.rewards[:n].copy(),
+            'next_states': self.next_states[:n].copy(),
+            'dones': self.dones[:n].copy(),
+            'links': self.links[:n].copy(),
+            'capacity': self.capacity,
+            'cursor': self.cursor,
+            'size': self.size,
+            'rng': self.rng.bit_generator.state
+        }
+    
+    def load_state_dict(self, state):
+        """Restaure un tampon copié par state_dict() (même capacité)"""
+        if state['capacity'] != self.capacity:
+            raise ValueError(f"Tampon incompatible: capacité {state['capacity']}, {self.capacity} attendue")
+        n = state['size']
+        self.states[:n] = state['states']
+        self.actions[:n] = state['actions']
+        self.rewards[:n] = state['rewards']
+        self.next_states[:n] = state['next_states']
+        self.dones[:n] = state['dones']
+        # Points de reprise antérieurs aux retours sur n pas : aucune séquence connue
+        self.links[:n] = state.get('links', 0)
+        self.cursor = state['cursor']
+        self.size = n
+        self.rng.bit_generator.state = state['rng']
+    
+    def flush(self):
+        """Rien à écrire : la mémoire vit entièrement en RAM"""
+        pass
+    
+    def _n_step(self, idx):
+        """
+        Suit les séquences à partir de idx, n_step - 1 pas au plus, tous les
+        tirages à la fois. Retourne (dernières positions, retours, facteurs
+        d'actualisation du bootstrap).
+        """
+        returns = np.asarray(self.rewards[idx], dtype=np.float32)
+        discounts = np.full(len(idx), self.gamma, dtype=np.float32)
+        last = idx
+        if self.n_step > 1:
+            returns = returns.copy()
+            # Transitions écrites après idx : un lien au-delà mène à une position écrasée ou vide
+            remaining = (self.cursor - idx - 1) % self.capacity
+            offset = np.zeros(len(idx), dtype=np.int64)
+            for _ in range(self.n_step - 1):
+                link = self.links[last]
+                offset += link
+                alive = (self.dones[last] == 0) & (link > 0) & (offset <= remaining)
+                if not alive.any():
+                    break
+                last = np.where(alive, (last + link) % self.capacity, last)
+                returns += np.where(alive, discounts * self.rewards[last], 0.0)
+                discounts = np.where(alive, discounts * self.gamma, discounts).astype(np.float32)
+        return last, returns, discounts
+    
+    def _gather(self, idx):
+        """
+        Lot (states, actions, rewards, next_states, dones, discounts) : une seule
+        copie par tableau grâce à l'indexation avancée de NumPy. Les cibles sont
+        rewards + discounts * max Q(next_states) * (1 - dones).
+        """
+        last, returns, discounts = self._n_step(idx)
+        return (np.asarray(self.states[idx]), np.asarray(self.actions[idx]), returns,
+                np.asarray(self.next_states[last]), np.asarray(self.dones[last]), discounts)
+
+class MemmapReplayBuffer(ReplayBuffer):
+    """
+    Mémoire d'expériences sur disque : chaque tableau est un np.memmap dans le
+    répertoire path (un fichier .dat par champ, plus meta.json pour la capacité
+    et le curseur). La capacité n'est limitée que par le disque, et un tampon
+    existant est rouvert instantanément, sans copie, par un nouvel
+    entraînement. Avec readonly=True, plusieurs learners peuvent partager le
+    même tampon : add() n'écrit rien et len() relit tous les REFRESH_EVERY
+    appels la taille écrite par le processus rédacteur (refresh()).
+    """
+    REFRESH_EVERY = 100  # Appels à len() entre deux relectures d'un tampon en lecture seule
+    FIELDS = (('states', np.float32, True), ('actions', np.int32, False),
+              ('rewards', np.float32, False), ('next_states', np.float32, True),
+              ('dones', np.float32, False), ('links', np.int32, False))
+    
+    def __init__(self, path, capacity=None, state_size=None, readonly=False, seed=None,
+                 n_step=1, gamma=0.95):
+        # Pas d'appel à ReplayBuffer.__init__ : les tableaux ne sont pas alloués en RAM
+        self.path = path
+        self.readonly = readonly
+        meta = self._read_meta()
+        if meta is not None:
+            if state_size is not None and state_size != meta['state_size']:
+                raise ValueError(f"Tampon {path} incompatible: états de taille {meta['state_size']}, "
+                                 f"{state_size} attendue")
+            capacity, state_size = meta['capacity'], meta['state_size']  # Capacité du tampon existant
+            mode = 'r' if readonly else 'r+'
+        elif readonly:
+            raise FileNotFoundError(f"Aucune mémoire d'expériences dans {path}")
+        elif capacity is None or state_size is None:
+            raise ValueError("capacity et state_size sont nécessaires pour créer un tampon")
+        else:
+            os.makedirs(path, exist_ok=True)
+            mode = 'w+'
+        
+        self.capacity = capacity
+        self.state_size = state_size
+        self.n_step = n_step
+        self.gamma = gamma
+        for name, dtype, per_state in self.FIELDS:
+            shape = (capacity, state_size) if per_state else (capacity,)
+            field_path = os.path.join(path, f'{name}.dat')
+            field_mode = mode
+            if mode == 'r+' and not os.path.exists(field_path):
+                field_mode = 'w+'  # Tampon antérieur aux liens entre transitions : créés à 0
+            setattr(self, name, np.memmap(field_path, dtype=dtype, mode=field_mode, shape=shape))
+        self.cursor = meta['cursor'] if meta else 0
+        self.size = meta['size'] if meta else 0
+        self.rng = np.random.default_rng(seed)
+        self._reads = 0
+        if meta is None:
+            self.flush()
+    
+    def __len__(self):
+        # En lecture seule, la taille est relue même tant que le tampon est trop petit pour entraîner
+        if self.readonly:
+            if self._reads % self.REFRESH_EVERY == 0:
+                self.refresh()
+            self._reads += 1
+        return self.size
+    
+    def add(self, state, action, reward, next_state, done):
+        if not self.readonly:
+            super().add(state, action, reward, next_state, done)
+    
+    def add_batch(self, states, actions, rewards, next_states, dones, stride=0):
+        if not self.readonly:
+            super().add_batch(states, actions, rewards, next_states, dones, stride)
+    
+    def _read_meta(self):
+        try:
+            with open(os.path.join(self.path, 'meta.json')) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+    
+    def refresh(self):
+        """Relit le curseur et la taille écrits par un autre processus"""
+        meta = self._read_meta()
+        self.cursor, self.size = meta['cursor'], meta['size']
+    
+    def flush(self):
+        """Écrit les pages modifiées sur disque puis, atomiquement, le curseur et la taille"""
+        if self.readonly:
+            return
+        for name, _, _ in self.FIELDS:
+            getattr(self, name).flush()
+        meta_path = os.path.join(self.path, 'meta.json')
+        with open(meta_path + '.tmp', 'w') as f:
+            json.dump({'capacity': self.capacity, 'state_size': self.state_size,
+                       'cursor': self.cursor, 'size': self.size}, f)
+        os.replace(meta_path + '.tmp', meta_path)
+    
+    def sample(self, batch_size):
+        """
+        Tirage uniforme avec remise. Les indices sont triés : le lot est lu dans
+        l'ordre du fichier, ce qui regroupe les défauts de page et les lectures.
+        """
+        idx = np.sort(self.rng.integers(0, self.size, size=batch_size))
+        return self._gather(idx)
+    
+    def state_dict(self):
+        """Les transitions restent sur disque : seuls le curseur et le générateur sont copiés"""
+        self.flush()
+        return {
+            'path': self.path,
+            'capacity': self.capacity,
+            'cursor': self.cursor,
+            'size': self.size,
+            'rng': self.rng.bit_generator.state
+        }
+    
+    def load_state_dict(self, state):
+        if state['capacity'] != self.capacity:
+            raise ValueError(f"Tampon incompatible: capacité {state['capacity']}, {self.capacity} attendue")
+        self.cursor = state['cursor']
+        self.size = state['size']
+        self.rng.bit_generator.state = state['rng']
+
+class SumTree:
+    """
+    Arbre de sommes binaire complet stocké dans un tableau : le nœud 1 est la
+    racine, les enfants du nœud i sont 2i et 2i+1, et les feuilles (priorités)
+    commencent à num_leaves. Mises à jour et tirages en O(log n), vectorisés.
+    """
+    def __init__(self, capacity):
+        self.num_leaves = 1 << max(0, (capacity - 1).bit_length())
+        self.tree = np.zeros(2 * self.num_leaves, dtype=np.float64)
+    
+    def total(self):
+        """Somme de toutes les priorités"""
+        return self.tree[1]
+    
+    def get(self, idx):
+        """Priorités des feuilles idx"""
+        return self.tree[np.asarray(idx) + self.num_leaves]
+    
+    def set(self, i, priority):
+        """Met à jour une seule feuille (propagation scalaire jusqu'à la racine)"""
+        tree = self.tree
+        node = i + self.num_leaves
+        delta = priority - tree[node]
+        while node >= 1:
+            tree[node] += delta
+            node >>= 1
+    
+    def update(self, idx, priorities):
+        """Met à jour un lot de feuilles puis recalcule leurs ancêtres niveau par niveau"""
+        nodes = np.asarray(idx, dtype=np.int64) + self.num_leaves
+        self.tree[nodes] = priorities
+        nodes //= 2
+        # Toutes les feuilles sont à la même profondeur : les doublons recalculent la même valeur
+        while nodes[0] >= 1:
+            self.tree[nodes] = self.tree[2 * nodes] + self.tree[2 * nodes + 1]
+            nodes //= 2
+    
+    def find(self, values):
+        """Pour chaque valeur de [0, total), indice de la feuille dont l'intervalle cumulé la contient"""
+        values = np.array(values, dtype=np.float64)
+        nodes = np.ones(len(values), dtype=np.int64)
+        while nodes[0] < self.num_leaves:
+            left = 2 * nodes
+            left_sum = self.tree[left]
+            go_right = values > left_sum
+            values = np.where(go_right, values - left_sum, values)
+            nodes = np.where(go_right, left + 1, left)
+        return nodes - self.num_leaves
+
+class PrioritizedReplayBuffer(ReplayBuffer):
+    """
+    Mémoire d'expériences priorisée (tirage proportionnel à |erreur TD|^alpha)
+    avec poids d'échantillonnage préférentiel corrigés par beta.
+    """
+    def __init__(self, capacity, state_size, alpha=0.6, beta=0.4, beta_increment=1e-4,
+                 epsilon=1e-5, seed=None, n_step=1, gamma=0.95):
+        super().__init__(capacity, state_size, seed, n_step, gamma)
+        self.alpha = alpha  # 0 = tirage uniforme, 1 = entièrement proportionnel
+        self.beta = beta  # Correction du biais, augmentée progressivement jusqu'à 1
+        self.beta_increment = beta_increment
+        self.epsilon = epsilon  # Garantit une priorité non nulle à toutes les transitions
+        self.max_priority = 1.0
+        self.tree = SumTree(capacity)
+    
+    def add(self, state, action, reward, next_state, done):
+        """Stocke une transition avec la priorité maximale vue jusqu'ici"""
+        i = self.cursor
+        super().add(state, action, reward, next_state, done)
+        self.tree.set(i, self.max_priority ** self.alpha)
+    
+    def add_batch(self, states, actions, rewards, next_states, dones, stride=0):
+        idx = (self.cursor + np.arange(len(actions))) % self.capacity
+        super().add_batch(states, actions, rewards, next_states, dones, stride)
+        self.tree.update(idx, np.full(len(idx), self.max_priority ** self.alpha))
+    
+    def sample(self, batch_size):
+        """
+        Tirage stratifié proportionnel aux priorités. Retourne
+        (states, actions, rewards, next_states, dones, discounts, indices, weights).
+        """
+        total = self.tree.total()
+        segment = total / batch_size
+        values = (np.arange(batch_size) + self.rng.random(batch_size)) * segment
+        idx = np.minimum(self.tree.find(values), self.size - 1)
+        
+        # Poids d'échantillonnage préférentiel normalisés par le poids maximal
+        probs = self.tree.get(idx) / total
+        weights = (self.size * probs) ** -self.beta
+        weights = (weights / weights.max()).astype(np.float32)
+        self.beta = min(1.0, self.beta + self.beta_increment)
+        
+        return self._gather(idx) + (idx, weights)
+    
+    def state_dict(self):
+        state = super().state_dict()
+        state.update(tree=self.tree.tree.copy(), max_priority=self.max_priority, beta=self.beta)
+        return state
+    
+    def load_state_dict(self, state):
+        super().load_state_dict(state)
+        self.tree.tree[:] = state['tree']
+        self.max_priority = state['max_priority']
+        self.beta = state['beta']
+    
+    def update_priorities(self, idx, td_errors):
+        """Met à jour les priorités des transitions idx à partir de leurs erreurs TD"""
+        priorities = np.abs(td_errors) + self.epsilon
+        self.max_priority = max(self.max_priority, float(priorities.max()))
+        self.tree.update(idx, priorities ** self.alpha)
+
+def make_replay_buffer(capacity, state_size, path=None, readonly=False, prioritized=False, n_step=1, gamma=0.95):
+    """
+    Mémoire d'expériences d'un agent : sur disque dans path (seulement lue avec
+    readonly, pour partager le tampon d'un autre entraînement), priorisée par
+    l'erreur TD si demandé, sinon en RAM.
+    """
+    if readonly and path is None:
+        raise ValueError("memory_readonly nécessite une mémoire sur disque (memory_path)")
+    if path is not None:
+        if prioritized:
+            raise ValueError("La mémoire priorisée n'est pas disponible sur disque")
+        return MemmapReplayBuffer(path, capacity, state_size, readonly=readonly, n_step=n_step, gamma=gamma)
+    if prioritized:
+        return PrioritizedReplayBuffer(capacity, state_size, n_step=n_step, gamma=gamma)
+    return ReplayBuffer(capacity, state_size, n_step=n_step, gamma=gamma)
@@ -0,0 +1,264 @@
+import argparse
+import asyncio
+import os
+import time
+from collections import deque
+import numpy as np
+from snake_logic import SnakeGame
+from snake_policy import load_policy
+
+class BatchStats:
+    """Métriques du serveur d'inférence sur les window derniers lots"""
+    def __init__(self, window=1000):
+        self.batches = 0
+        self.requests = 0
+        self.batch_sizes = deque(maxlen=window)
+        self.queue_depths = deque(maxlen=window)  # Demandes en attente au moment de former chaque lot
+        self.latencies = deque(maxlen=window * 16)  # Attente + inférence de chaque demande (s)
+    
+    def record(self, batch_size, queue_depth, latencies):
+        self.batches += 1
+        self.requests += batch_size
+        self.batch_sizes.append(batch_size)
+        self.queue_depths.append(queue_depth)
+        self.latencies.extend(latencies)
+    
+    def summary(self):
+        if not self.batches:
+            return {'batches': 0, 'requests': 0}
+        latencies = np.array(self.latencies) * 1000
+        return {
+            'batches': self.batches,
+            'requests': self.requests,
+            'batch_size_mean': float(np.mean(self.batch_sizes)),
+            'batch_size_max': int(max(self.batch_sizes)),
+            'queue_depth_mean': float(np.mean(self.queue_depths)),
+            'queue_depth_max': int(max(self.queue_depths)),
+            'latency_ms_p50': float(np.percentile(latencies, 50)),
+            'latency_ms_p99': float(np.percentile(latencies, 99))
+        }
+
+class InferenceServer:
+    """
+    Service d'inférence asyncio partagé par de nombreuses parties simultanées.
+    Les états reçus sont regroupés en lots : un lot part dès qu'il atteint
+    max_batch_size demandes ou que la plus ancienne attend depuis max_delay
+    secondes. Une seule passe avant (policy.act_batch) calcule toutes les
+    actions, renvoyées ensuite à chaque demandeur.
+    
+    En local, les parties appellent directement `await server.act(state)` ;
+    serve_unix() expose le même service sur un socket Unix (voir InferenceClient).
+    """
+    def __init__(self, policy, max_batch_size=256, max_delay=0.002):
+        self.policy = policy
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self.state_size = policy.state_size
+        self.stats = BatchStats()
+        self._states = np.empty((max_batch_size, self.state_size), dtype=np.float32)
+        # Demandes en attente (état, future, heure d'arrivée) : une simple liste, le
+        # collecteur n'est réveillé qu'à la première demande et quand le lot est plein
+        self._pending = []
+        self._has_pending = None
+        self._batch_full = None
+        self._task = None
+    
+    async def start(self):
+        self._has_pending = asyncio.Event()
+        self._batch_full = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        # Les demandes restantes ne seront jamais servies
+        for _, future, _ in self._pending:
+            if not future.done():
+                future.cancel()
+        self._pending.clear()
+    
+    async def __aenter__(self):
+        await self.start()
+        return self
+    
+    async def __aexit__(self, *exc):
+        await self.stop()
+    
+    def queue_depth(self):
+        return len(self._pending)
+    
+    async def act(self, state):
+        """Action gloutonne pour state, calculée dans le prochain lot"""
+        future = asyncio.get_running_loop().create_future()
+        pending = self._pending
+        pending.append((state, future, time.perf_counter()))
+        if len(pending) == 1:
+            self._has_pending.set()
+        if len(pending) >= self.max_batch_size:
+            self._batch_full.set()
+        return await future
+    
+    async def _run(self):
+        pending = self._pending
+        while True:
+            await self._has_pending.wait()
+            # Attend un lot complet, au plus jusqu'à l'échéance de la plus ancienne demande
+            timeout = pending[0][2] + self.max_delay - time.perf_counter()
+            if len(pending) < self.max_batch_size and timeout > 0:
+                try:
+                    await asyncio.wait_for(self._batch_full.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+            queue_depth = len(pending)  # Avant le retrait du lot : lot compris
+            batch = pending[:self.max_batch_size]
+            del pending[:self.max_batch_size]
+            if len(pending) < self.max_batch_size:
+                self._batch_full.clear()
+            if not pending:
+                self._has_pending.clear()
+            self._serve(batch, queue_depth)
+    
+    def _serve(self, batch, queue_depth):
+        n = len(batch)
+        states = self._states[:n]
+        for i, (state, _, _) in enumerate(batch):
+            states[i] = state
+        actions = self.policy.act_batch(states)
+        now = time.perf_counter()
+        for (_, future, _), action in zip(batch, actions.tolist()):
+            if not future.cancelled():
+                future.set_result(action)
+        self.stats.record(n, queue_depth, [now - start for _, _, start in batch])
+    
+    async def serve_unix(self, path):
+        """
+        Sert les clients d'un socket Unix : chaque connexion envoie un état
+        (state_size float32) et reçoit l'action sur un octet, une demande à la fois.
+        """
+        if os.path.exists(path):
+            os.remove(path)
+        return await asyncio.start_unix_server(self._handle_client, path)
+    
+    async def _handle_client(self, reader, writer):
+        request_size = self.state_size * 4
+        try:
+            while True:
+                data = await reader.readexactly(request_size)
+                action = await self.act(np.frombuffer(data, dtype=np.float32))
+                writer.write(bytes((action,)))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass  # Client déconnecté
+        finally:
+            writer.close()
+
+class InferenceClient:
+    """Une partie connectée à un InferenceServer par socket Unix"""
+    def __init__(self, reader, writer):
+        self._reader = reader
+        self._writer = writer
+    
+    @classmethod
+    async def connect(cls, path):
+        reader, writer = await asyncio.open_unix_connection(path)
+        return cls(reader, writer)
+    
+    async def act(self, state):
+        self._writer.write(np.asarray(state, dtype=np.float32).tobytes())
+        data = await self._reader.readexactly(1)
+        return data[0]
+    
+    async def close(self):
+        self._writer.close()
+        await self._writer.wait_closed()
+
+async def play_session(act, env, episodes):
+    """Joue episodes parties en demandant chaque action à act ; retourne (scores, coups joués)"""
+    scores = []
+    moves = 0
+    state = np.empty(SnakeGame.STATE_SIZE, dtype=np.float32)
+    for _ in range(episodes):
+        env.reset(out=state)
+        done = False
+        while not done:
+            action = await act(state)
+            _, _, done = env.step(action, out=state)
+            moves += 1
+        scores.append(env.score)
+    return scores, moves
+
+async def run_games(server, num_games, episodes, socket_path=None, seed=0):
+    """
+    Joue num_games parties simultanées contre server, en local ou via des
+    clients du socket socket_path. Retourne (scores, coups, durée).
+    """
+    envs = [SnakeGame(400, 400, 20, seed=seed + i) for i in range(num_games)]
+    clients = []
+    if socket_path is None:
+        acts = [server.act] * num_games
+    else:
+        clients = [await InferenceClient.connect(socket_path) for _ in range(num_games)]
+        acts = [client.act for client in clients]
+    
+    start = time.perf_counter()
+    results = await asyncio.gather(*(play_session(act, env, episodes) for act, env in zip(acts, envs)))
+    elapsed = time.perf_counter() - start
+    for client in clients:
+        await client.close()
+    scores = [score for session_scores, _ in results for score in session_scores]
+    return scores, sum(moves for _, moves in results), elapsed
+
+def print_stats(stats):
+    summary = stats.summary()
+    if not summary['batches']:
+        print("Aucune demande servie")
+        return
+    print(f"Lots: {summary['batches']}, demandes: {summary['requests']}, "
+          f"taille moyenne: {summary['batch_size_mean']:.1f} (max {summary['batch_size_max']}), "
+          f"file moyenne: {summary['queue_depth_mean']:.1f} (max {summary['queue_depth_max']}), "
+          f"latence p50/p99: {summary['latency_ms_p50']:.2f}/{summary['latency_ms_p99']:.2f} ms")
+
+async def _serve_forever(server, path, report_every):
+    await server.start()
+    unix_server = await server.serve_unix(path)
+    print(f"Serveur d'inférence sur {path}")
+    async with unix_server:
+        while True:
+            await asyncio.sleep(report_every)
+            print_stats(server.stats)
+
+async def _demo(server, num_games, episodes, socket_path):
+    async with server:
+        unix_server = await server.serve_unix(socket_path) if socket_path else None
+        scores, moves, elapsed = await run_games(server, num_games, episodes, socket_path)
+        if unix_server is not None:
+            unix_server.close()
+            await unix_server.wait_closed()
+    print(f"{num_games} parties simultanées, {len(scores)} épisodes: score moyen {np.mean(scores):.2f}, "
+          f"{moves / elapsed:.0f} coups/s")
+    print_stats(server.stats)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serveur d'inférence par lots pour de nombreuses parties simultanées")
+    parser.add_argument('model', help="Modèle (.npz exporté ou poids Keras)")
+    parser.add_argument('--socket', metavar='PATH', help="Sert les clients d'un socket Unix au lieu de jouer localement")
+    parser.add_argument('--games', type=int, default=256, help="Parties simultanées jouées localement")
+    parser.add_argument('--episodes', type=int, default=4, help="Épisodes par partie locale")
+    parser.add_argument('--max-batch', type=int, default=256, help="Taille maximale d'un lot")
+    parser.add_argument('--max-delay', type=float, default=2.0, help="Attente maximale d'une demande avant inférence (ms)")
+    parser.add_argument('--via-socket', action='store_true',
+                        help="Parties locales connectées par socket Unix (mesure le coût du transport)")
+    parser.add_argument('--report-every', type=float, default=10.0, help="Affichage des métriques du serveur (s)")
+    parser.add_argument('--cache', action='store_true',
+                        help="Mémorise la décision du réseau pour chaque état distinct")
+    args = parser.parse_args()
+    
+    server = InferenceServer(load_policy(args.model, cache=args.cache), args.max_batch, args.max_delay / 1000)
+    if args.socket:
+        asyncio.run(_serve_forever(server, args.socket, args.report_every))
+    else:
+        socket_path = f'/tmp/snake_server_{os.getpid()}.sock' if args.via_socket else None
+        asyncio.run(_demo(server, args.games, args.episodes, socket_path))
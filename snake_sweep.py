@@ -0,0 +1,178 @@
+import argparse
+import contextlib
+import csv
+import itertools
+import json
+import math
+import multiprocessing as mp
+import os
+import random
+import time
+import numpy as np
+
+# Hyperparamètres transmis à DQNAgent ; les autres vont à train_dqn_agent_headless
+AGENT_PARAMS = ('gamma', 'epsilon_decay', 'learning_rate', 'hidden_sizes', 'memory_size', 'prioritized', 'n_step')
+
+def expand_grid(params):
+    """Toutes les combinaisons d'une grille {nom: [valeurs]}"""
+    names = sorted(params)
+    return [dict(zip(names, values)) for values in itertools.product(*(params[name] for name in names))]
+
+def sample_random(params, samples, seed=None):
+    """
+    Tirages aléatoires : une liste est une liste de choix, un dictionnaire
+    {"low", "high", "log", "int"} une loi uniforme (log-uniforme si log).
+    """
+    rng = random.Random(seed)
+    configs = []
+    for _ in range(samples):
+        config = {}
+        for name in sorted(params):
+            spec = params[name]
+            if isinstance(spec, dict):
+                low, high = spec['low'], spec['high']
+                if spec.get('log'):
+                    value = math.exp(rng.uniform(math.log(low), math.log(high)))
+                else:
+                    value = rng.uniform(low, high)
+                config[name] = int(round(value)) if spec.get('int') else value
+            else:
+                config[name] = rng.choice(spec)
+        configs.append(config)
+    return configs
+
+def load_spec(path):
+    """
+    Lit une spécification de recherche JSON, par exemple :
+        {"search": "random", "samples": 20, "seed": 0, "episodes": 300,
+         "params": {"learning_rate": {"low": 1e-4, "high": 1e-2, "log": true},
+                    "hidden_sizes": [[64, 64], [128, 128]], "batch_size": [32, 64]}}
+    et retourne (configurations, épisodes par entraînement).
+    """
+    with open(path) as f:
+        spec = json.load(f)
+    if spec.get('search', 'grid') == 'grid':
+        configs = expand_grid(spec['params'])
+    else:
+        configs = sample_random(spec['params'], spec['samples'], spec.get('seed'))
+    return configs, spec.get('episodes', 500)
+
+def _init_worker(threads):
+    # Avant tout import de TensorFlow dans ce processus : threads limités par entraînement
+    os.environ['TF_NUM_INTRAOP_THREADS'] = str(threads)
+    os.environ['TF_NUM_INTEROP_THREADS'] = str(threads)
+    os.environ['OMP_NUM_THREADS'] = str(threads)
+    os.environ['TF_CPP_MIN_LOG_LEVEL'] = '2'
+
+def _run_job(job):
+    """Un entraînement headless dans son propre répertoire ; retourne son résultat"""
+    run_dir, name, config, episodes, seed, threads = job
+    import tensorflow as tf
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(threads)
+    random.seed(seed)
+    np.random.seed(seed)
+    tf.random.set_seed(seed)
+    from snake_train import train_dqn_agent_headless
+    
+    agent_params = {key: value for key, value in config.items() if key in AGENT_PARAMS}
+    train_params = {key: value for key, value in config.items() if key not in AGENT_PARAMS}
+    result = {'run': name, 'config': config}
+    start = time.time()
+    # Les fichiers de l'entraînement (modèles, métriques) sont écrits dans run_dir
+    os.chdir(run_dir)
+    try:
+        with open('train.log', 'w') as log, contextlib.redirect_stdout(log):
+            # Même graine pour le jeu : les épisodes joués sont reproductibles
+            agent, metrics = train_dqn_agent_headless(episodes=episodes, metrics_log='metrics.csv',
+                                                      agent_params=agent_params, seed=seed, **train_params)
+        result.update(avg_score=metrics.scores.mean(), max_score=metrics.max_score,
+                      episodes=metrics.episodes, train_steps=agent.train_steps)
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+    result['wall_time'] = time.time() - start
+    with open('result.json', 'w') as f:
+        json.dump(result, f, indent=2)
+    return result
+
+def run_sweep(configs, output_dir, episodes=500, workers=None, threads_per_worker=1, seed=0):
+    """
+    Lance un entraînement headless par configuration dans un pool de processus
+    (par défaut autant que de cœurs divisés par threads_per_worker), chacun
+    dans output_dir/run_XXX. Les entraînements déjà terminés (result.json
+    présent) ne sont pas relancés. Retourne les résultats classés par score
+    moyen final.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    workers = workers or max(1, (os.cpu_count() or 1) // threads_per_worker)
+    results = []
+    jobs = []
+    for i, config in enumerate(configs):
+        name = f'run_{i:03d}'
+        run_dir = os.path.abspath(os.path.join(output_dir, name))
+        result_path = os.path.join(run_dir, 'result.json')
+        if os.path.exists(result_path):
+            with open(result_path) as f:
+                results.append(json.load(f))
+            continue
+        os.makedirs(run_dir, exist_ok=True)
+        with open(os.path.join(run_dir, 'config.json'), 'w') as f:
+            json.dump(config, f, indent=2)
+        jobs.append((run_dir, name, config, episodes, seed + i, threads_per_worker))
+    
+    if jobs:
+        print(f"{len(jobs)} entraînements sur {min(workers, len(jobs))} processus "
+              f"({threads_per_worker} thread(s) TensorFlow chacun)")
+        # Un processus neuf par entraînement (maxtasksperchild=1) : pas d'état TensorFlow partagé
+        ctx = mp.get_context('spawn')
+        with ctx.Pool(min(workers, len(jobs)), initializer=_init_worker,
+                      initargs=(threads_per_worker,), maxtasksperchild=1) as pool:
+            for result in pool.imap_unordered(_run_job, jobs):
+                status = result.get('error') or f"score moyen {result['avg_score']:.2f}"
+                print(f"{result['run']} terminé en {result['wall_time']:.0f} s: {status}")
+                results.append(result)
+    
+    ranked = rank_results(results)
+    write_summary(ranked, os.path.join(output_dir, 'summary.csv'))
+    return ranked
+
+def rank_results(results):
+    """Classe les entraînements par score moyen final, puis par meilleur score ; les échecs en dernier"""
+    return sorted(results, key=lambda r: ('error' in r, -r.get('avg_score', 0.0), -r.get('max_score', 0)))
+
+def write_summary(ranked, path):
+    names = sorted({name for result in ranked for name in result['config']})
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['rank', 'run', 'avg_score', 'max_score', 'episodes', 'wall_time'] + names + ['error'])
+        for rank, result in enumerate(ranked, 1):
+            writer.writerow([rank, result['run'], result.get('avg_score'), result.get('max_score'),
+                             result.get('episodes'), f"{result['wall_time']:.1f}"] +
+                            [json.dumps(result['config'].get(name)) for name in names] +
+                            [result.get('error', '')])
+
+def print_summary(ranked, top=20):
+    print(f"{'#':>3}  {'run':<8} {'moyenne':>8} {'max':>5} {'durée':>7}  paramètres")
+    for rank, result in enumerate(ranked[:top], 1):
+        params = ', '.join(f"{name}={value}" for name, value in sorted(result['config'].items()))
+        if 'error' in result:
+            print(f"{rank:>3}  {result['run']:<8} {'échec':>8} {'':>5} {result['wall_time']:>6.0f}s  "
+                  f"{params} ({result['error']})")
+        else:
+            print(f"{rank:>3}  {result['run']:<8} {result['avg_score']:>8.2f} {result['max_score']:>5} "
+                  f"{result['wall_time']:>6.0f}s  {params}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recherche d'hyperparamètres en parallèle (entraînements headless)")
+    parser.add_argument('spec', help="Spécification JSON de la recherche (grille ou tirages aléatoires)")
+    parser.add_argument('--output', default='sweep', help="Répertoire des résultats (un sous-répertoire par entraînement)")
+    parser.add_argument('--episodes', type=int, help="Épisodes par entraînement (remplace celui de la spécification)")
+    parser.add_argument('--workers', type=int, help="Nombre de processus (par défaut : cœurs / threads)")
+    parser.add_argument('--threads', type=int, default=1, help="Threads TensorFlow par entraînement")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    
+    configs, episodes = load_spec(args.spec)
+    ranked = run_sweep(configs, args.output, args.episodes or episodes, args.workers, args.threads, args.seed)
+    print_summary(ranked)
+    print(f"Résumé complet dans {os.path.join(args.output, 'summary.csv')}")
@@ -0,0 +1,183 @@
+import argparse
+import os
+import random
+import numpy as np
+from snake_replay import make_replay_buffer
+from snake_policy import STATE_KEY_BITS, pack_states, state_key
+
+def npz_path(name):
+    """Fichier réellement écrit pour un nom de modèle : snake_model.h5 -> snake_model.npz"""
+    return os.path.splitext(name)[0] + '.npz'
+
+class QTable:
+    """Table des valeurs Q (clé d'état x action), avec l'interface de poids d'un modèle Keras"""
+    def __init__(self, num_keys, action_size):
+        self.q = np.zeros((num_keys, action_size), dtype=np.float32)
+    
+    def get_weights(self):
+        return [self.q.copy()]
+    
+    def set_weights(self, weights):
+        self.q[:] = weights[0]
+
+class TabularAgent:
+    """
+    Q-learning tabulaire sur l'état compacté de SnakeGame.get_state (voir
+    pack_states) : 9 bits binaires x length_buckets niveaux de longueur x
+    actions, soit 136 Ko avec 16 niveaux. Même interface que DQNAgent
+    (act, remember, replay, save, load...) : il s'entraîne avec snake_train.py
+    (--agent tabular) en quelques secondes, sans TensorFlow, et se joue avec
+    snake_test.py, snake_eval.py ou snake_server.py.
+    
+    replay() applique une mise à jour de Q-learning vectorisée sur un lot
+    tiré de la même mémoire d'expériences que DQNAgent (retours sur n pas
+    compris) ; les mises à jour d'une même entrée dans le lot sont moyennées.
+    """
+    def __init__(self, state_size=12, action_size=4, memory_size=10000, memory_path=None,
+                 gamma=0.95, epsilon_decay=0.995, learning_rate=0.1, length_buckets=16, n_step=1,
+                 inference_only=False, memory_readonly=False):
+        self.state_size = state_size
+        self.action_size = action_size
+        self.gamma = gamma
+        self.n_step = n_step
+        self.prioritized = False
+        if inference_only:
+            self.memory = None
+        else:
+            self.memory = make_replay_buffer(memory_size, state_size, memory_path, memory_readonly,
+                                             n_step=n_step, gamma=gamma)
+        self.epsilon = 0.0 if inference_only else 1.0
+        self.epsilon_min = 0.01
+        self.epsilon_decay = epsilon_decay
+        self.learning_rate = learning_rate
+        self.length_buckets = length_buckets
+        self.train_steps = 0
+        self.model = QTable((length_buckets + 1) << STATE_KEY_BITS, action_size)
+        self.target_model = None  # Pas de réseau cible : la table est mise à jour directement
+        self.q_cache = None
+    
+    @classmethod
+    def from_file(cls, name):
+        """Agent d'inférence chargé depuis un fichier écrit par save()"""
+        with np.load(npz_path(name)) as data:
+            q = data['q']
+            agent = cls(action_size=q.shape[1], length_buckets=int(data['length_buckets']),
+                        inference_only=True)
+        agent.model.q[:] = q
+        return agent
+    
+    def update_target_model(self):
+        """Sans effet : conservé pour la boucle d'entraînement commune avec DQNAgent"""
+        pass
+    
+    def invalidate_cache(self):
+        pass
+    
+    def remember(self, state, action, reward, next_state, done):
+        self.memory.add(state, action, reward, next_state, done)
+    
+    def act(self, state, training=True):
+        """Action epsilon-gloutonne (gloutonne si training est faux)"""
+        if training and np.random.rand() <= self.epsilon:
+            return random.randrange(self.action_size)
+        return int(self.model.q[state_key(state, self.length_buckets)].argmax())
+    
+    def act_batch(self, states):
+        """Actions gloutonnes pour un batch d'états (N, state_size)"""
+        return self.model.q[pack_states(states, self.length_buckets)].argmax(axis=1)
+    
+    def replay(self, batch_size):
+        """Mise à jour de Q-learning sur un lot tiré de la mémoire"""
+        if len(self.memory) < batch_size:
+            return
+        
+        states, actions, rewards, next_states, dones, discounts = self.memory.sample(batch_size)
+        q = self.model.q
+        keys = pack_states(states, self.length_buckets)
+        next_keys = pack_states(next_states, self.length_buckets)
+        targets = rewards + discounts * q[next_keys].max(axis=1) * (1.0 - dones)
+        entries = keys * self.action_size + actions
+        td_errors = targets - q.ravel()[entries]
+        
+        # Erreur moyenne par entrée : les doublons du lot ne multiplient pas le pas d'apprentissage
+        unique, inverse = np.unique(entries, return_inverse=True)
+        mean_errors = np.bincount(inverse, weights=td_errors) / np.bincount(inverse)
+        q.ravel()[unique] += self.learning_rate * mean_errors
+        self.train_steps += 1
+        
+        if self.epsilon > self.epsilon_min:
+            self.epsilon *= self.epsilon_decay
+    
+    def get_optimizer_weights(self):
+        return []
+    
+    def set_optimizer_weights(self, weights):
+        if weights:
+            raise ValueError("TabularAgent n'a pas d'optimiseur")
+    
+    def load(self, name):
+        """Charge une table sauvegardée (nom .h5 accepté : le fichier .npz correspondant est lu)"""
+        path = npz_path(name)
+        if os.path.exists(path):
+            with np.load(path) as data:
+                if 'kind' not in data.files or str(data['kind']) != 'tabular':
+                    raise ValueError(f"{path} ne contient pas une table Q")
+                if int(data['length_buckets']) != self.length_buckets:
+                    raise ValueError(f"Table incompatible: {int(data['length_buckets'])} niveaux de longueur, "
+                                     f"{self.length_buckets} attendus")
+                self.model.q[:] = data['q']
+    
+    def save(self, name):
+        """Sauvegarde la table dans le .npz correspondant à name"""
+        np.savez(npz_path(name), kind=np.array('tabular'), q=self.model.q,
+                 length_buckets=np.array(self.length_buckets))
+
+def decode_keys(keys, length_buckets):
+    """États représentatifs (N, 12) des clés de pack_states (inverse à la quantification près)"""
+    keys = np.asarray(keys, dtype=np.int64)
+    states = np.zeros((len(keys), 12), dtype=np.float32)
+    bits = keys & ((1 << STATE_KEY_BITS) - 1)
+    states[np.arange(len(keys)), bits >> 7] = 1  # Direction (one-hot)
+    for i in range(7):
+        states[:, 4 + i] = (bits >> i) & 1
+    states[:, 11] = (keys >> STATE_KEY_BITS) / length_buckets
+    return states
+
+def warm_start(agent, tabular, epochs=200, batch_size=32):
+    """
+    Initialise le réseau d'un DQNAgent en régressant ses valeurs Q sur celles
+    de la table pour tous les états visités, puis copie le modèle cible.
+    Retourne le nombre d'états utilisés.
+    """
+    q = tabular.model.q
+    keys = np.flatnonzero(np.any(q != 0, axis=1))
+    states = decode_keys(keys, tabular.length_buckets)
+    targets = q[keys]
+    # Actions jamais essayées : valeur de la pire action connue de l'état, pour ne pas les préférer
+    visited = targets != 0
+    worst = np.where(visited, targets, np.inf).min(axis=1, keepdims=True)
+    targets = np.where(visited, targets, worst)
+    # Régression sur des cibles normalisées, l'échelle est ensuite reportée sur la couche de sortie linéaire
+    scale = max(float(np.abs(targets).max()), 1.0)
+    agent.model.fit(states, targets / scale, epochs=epochs, batch_size=batch_size, verbose=0)
+    weights = agent.model.get_weights()
+    weights[-2] *= scale
+    weights[-1] *= scale
+    agent.model.set_weights(weights)
+    agent.update_target_model()
+    return len(keys)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Initialise un modèle DQN à partir d'une table Q entraînée")
+    parser.add_argument('table', help="Table Q sauvegardée par TabularAgent (python snake_train.py --agent tabular)")
+    parser.add_argument('output', help="Poids Keras à écrire (par exemple snake_model.h5 pour reprendre l'entraînement)")
+    parser.add_argument('--epochs', type=int, default=200)
+    args = parser.parse_args()
+    
+    os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '2')
+    from snake_dqn_agent import DQNAgent
+    tabular = TabularAgent.from_file(args.table)
+    agent = DQNAgent(tabular.state_size, tabular.action_size)
+    count = warm_start(agent, tabular, args.epochs)
+    path = agent.save(args.output)
+    print(f"Modèle initialisé sur {count} états visités, écrit dans {path}")
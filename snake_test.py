@@ -1,29 +1,27 @@
-import pygame
 import numpy as np
 import time
 from snake_logic import SnakeGame
-from snake_dqn_agent import DQNAgent
+from snake_policy import load_policy
 
-def test_agent(model_path="snake_model.h5", episodes=10, render=True, delay=0.1):
+def test_agent(model_path="snake_model.h5", episodes=10, render=True, delay=0.1, cache=True):
+    """
+    Joue des épisodes avec un modèle entraîné. Un fichier .npz (exporté par
+    DQNAgent.export_numpy) est joué en NumPy pur, sans importer TensorFlow ;
+    sans rendu, pygame n'est pas importé non plus. Avec cache, la décision
+    du réseau est mémorisée pour chaque état distinct.
+    """
     # Initialisation
     env = SnakeGame(width=400, height=400, cell_size=20)
     state_size = 12
     action_size = 4
-    agent = DQNAgent(state_size, action_size)
-    agent.load(model_path)
-    agent.epsilon = 0  # Pas d'exploration en test
+    agent = load_policy(model_path, state_size, action_size, cache=cache)  # Pas d'exploration en test
     
     # Pour le rendu Pygame
     if render:
+        import pygame
+        from snake_renderer import GameView
         pygame.init()
-        screen = pygame.display.set_mode((env.width, env.height))
-        pygame.display.set_caption('Snake AI')
-        clock = pygame.time.Clock()
-        colors = {
-            'bg': (0, 0, 0),
-            'snake': (0, 255, 0),
-            'food': (255, 0, 0)
-        }
+        view = GameView(env, 'Snake AI')
     
     total_scores = []
     
@@ -49,26 +47,9 @@ def test_agent(model_path="snake_model.h5", episodes=10, render=True, delay=0.1)
             state = next_state
             steps += 1
             
-            # Rendu graphique
+            # Rendu graphique (seules les cases modifiées sont redessinées)
             if render:
-                screen.fill(colors['bg'])
-                
-                # Dessin de la nourriture
-                food_x, food_y = env.food
-                pygame.draw.rect(screen, colors['food'], 
-                                (food_x, food_y, env.cell_size, env.cell_size))
-                
-                # Dessin du serpent
-                for segment in env.snake:
-                    pygame.draw.rect(screen, colors['snake'], 
-                                    (segment[0], segment[1], env.cell_size, env.cell_size))
-                
-                # Affichage du score
-                font = pygame.font.Font(None, 36)
-                score_text = font.render(f"Score: {env.score}", True, (255, 255, 255))
-                screen.blit(score_text, (10, 10))
-                
-                pygame.display.update()
+                view.draw(env)
                 time.sleep(delay)  # Ralentir pour mieux voir
         
         score = env.score
@@ -1,16 +1,183 @@
-import numpy as np
-import pygame
-import matplotlib.pyplot as plt
-import time
+import argparse
 import os
 from snake_logic import SnakeGame
-from snake_dqn_agent import DQNAgent
+from snake_profiling import TrainingProfiler, NullProfiler
+from snake_metrics import MetricsLog
+from snake_checkpoint import CheckpointManager
+from snake_recording import TrajectoryRecorder
 
-# Réduire les messages de TensorFlow
+# Réduire les messages de TensorFlow (importé seulement au début de l'entraînement,
+# comme pygame pour la visualisation : le module se charge sans eux)
 os.environ['TF_CPP_MIN_LOG_LEVEL'] = '2'
 
+def _make_agent(agent_type, memory_path, agent_params):
+    """DQNAgent (réseau Keras) ou TabularAgent (table Q NumPy, sans TensorFlow)"""
+    if agent_type == 'tabular':
+        from snake_tabular import TabularAgent
+        return TabularAgent(SnakeGame.STATE_SIZE, 4, memory_path=memory_path, **(agent_params or {}))
+    from snake_dqn_agent import DQNAgent
+    return DQNAgent(SnakeGame.STATE_SIZE, 4, memory_path=memory_path, **(agent_params or {}))
+
+def _load_existing_model(agent):
+    """Essaie de reprendre l'entraînement depuis le dernier modèle sauvegardé"""
+    try:
+        agent.load("snake_model.h5")
+        print("Modèle existant chargé.")
+    except:
+        print("Aucun modèle existant trouvé. Démarrage avec un nouveau modèle.")
+
+def _setup_checkpoint(agent, metrics, checkpoint_path, resume, env):
+    """
+    Prépare les points de reprise. En reprise, restaure l'état complet de
+    l'entraînement (générateur des graines d'épisodes de env compris) et
+    retourne le premier épisode restant à jouer. Les lignes du journal de
+    métriques des épisodes joués après le point de reprise sont retirées :
+    ces épisodes vont être rejoués.
+    """
+    if not checkpoint_path:
+        return None, 1
+    checkpoint = CheckpointManager(checkpoint_path)
+    if resume and checkpoint.exists():
+        counters = checkpoint.restore(agent, metrics, env)
+        metrics.truncate(counters['episode'])
+        print(f"Reprise depuis {checkpoint_path} après l'épisode {counters['episode']}.")
+        return checkpoint, counters['episode'] + 1
+    return checkpoint, 1
+
+def _end_episode(agent, metrics, episode, episodes, score, episode_reward, episode_steps,
+                 update_target_every, save_every, profiler, checkpoint=None, checkpoint_every=100, env=None):
+    """
+    Traitement de fin d'épisode : journal de métriques, mise à jour du modèle
+    cible, sauvegardes et points de reprise.
+    """
+    best_score = metrics.max_score
+    avg_score = metrics.append(episode, score, episode_reward, episode_steps, agent.epsilon)
+    
+    # Mise à jour du modèle cible périodiquement
+    if episode % update_target_every == 0:
+        with profiler.phase('target'):
+            agent.update_target_model()
+    
+    # Sauvegarde du meilleur modèle
+    if score > best_score:
+        with profiler.phase('save'):
+            agent.save("snake_model_best.h5")
+        print(f"Nouveau meilleur score: {score} à l'épisode {episode}! Modèle sauvegardé.")
+    
+    # Affichage des progrès dans la console
+    if episode % 10 == 0 or score > 3:
+        print(f"Episode: {episode}/{episodes}, Score: {score}, Récompense: {episode_reward:.1f}, Avg Score: {avg_score:.2f}, Epsilon: {agent.epsilon:.4f}")
+    
+    # Sauvegarde périodique du modèle
+    if episode % save_every == 0:
+        with profiler.phase('save'):
+            agent.save(f"snake_model_checkpoint_{episode}.h5")
+    
+    # Point de reprise complet, écrit en arrière-plan
+    if checkpoint is not None and episode % checkpoint_every == 0:
+        with profiler.phase('checkpoint'):
+            checkpoint.save_async(agent, {'episode': episode}, metrics, env)
+    
+    profiler.end_episode(episode, score=score, reward=episode_reward, epsilon=agent.epsilon)
+
+def _finish_training(agent, metrics, checkpoint=None, episode=0, recorder=None, env=None):
+    """
+    Sauvegarde du modèle final et du dernier point de reprise, fermeture du
+    journal de métriques et de l'enregistrement des épisodes.
+    """
+    agent.save("snake_model.h5")
+    agent.memory.flush()
+    if checkpoint is not None:
+        checkpoint.save(agent, {'episode': episode}, metrics, env)
+    metrics.close()
+    if recorder is not None:
+        recorder.close()
+        print(f"Épisodes enregistrés dans {recorder.path} "
+              f"(lecture : python snake_recording.py {recorder.path})")
+    print(f"Métriques enregistrées dans {metrics.path} "
+          f"(graphiques : python snake_metrics.py {metrics.path})")
+
+def train_dqn_agent_headless(episodes=1000, batch_size=64, update_target_every=5, save_every=100,
+                             profiler=None, metrics_log="snake_metrics.csv", checkpoint_path=None,
+                             checkpoint_every=100, resume=False, memory_path=None,
+                             record_path=None, agent_params=None, agent_type='dqn',
+                             loop_detection=None, seed=None):
+    """
+    Entraîne l'agent DQN sans aucune visualisation : pygame n'est jamais importé
+    et la boucle ne fait aucune pause. Les sauvegardes et métriques sont les
+    mêmes qu'avec train_dqn_agent_with_visualization.
+    
+    Args:
+        episodes: Nombre total d'épisodes d'entraînement
+        batch_size: Taille du batch pour l'apprentissage
+        update_target_every: Fréquence de mise à jour du modèle cible
+        save_every: Sauvegarder le modèle tous les N épisodes
+        profiler: TrainingProfiler optionnel mesurant le temps passé dans chaque phase
+        metrics_log: Journal CSV des métriques par épisode (voir snake_metrics.py)
+        checkpoint_path: Point de reprise complet (voir snake_checkpoint.py), None pour désactiver
+        checkpoint_every: Écrire le point de reprise tous les N épisodes
+        resume: Reprendre l'entraînement depuis checkpoint_path s'il existe
+        memory_path: Répertoire d'une mémoire d'expériences sur disque, rouverte si elle existe
+        record_path: Enregistre chaque épisode (graine et actions) pour le rejouer avec snake_recording.py
+        agent_params: Hyperparamètres passés à DQNAgent (gamma, learning_rate, hidden_sizes...)
+        agent_type: 'dqn' ou 'tabular' (TabularAgent, voir snake_tabular.py)
+        loop_detection: None, 'end' ou 'penalize' : fin ou pénalité dès qu'un plateau se répète (voir SnakeGame)
+        seed: Graine du générateur des épisodes du jeu (None : épisodes différents à chaque entraînement)
+    """
+    profiler = profiler or NullProfiler()
+    
+    # Initialisation du jeu et de l'agent
+    env = SnakeGame(width=400, height=400, cell_size=20, seed=seed, loop_detection=loop_detection)
+    agent = _make_agent(agent_type, memory_path, agent_params)
+    _load_existing_model(agent)
+    
+    metrics = MetricsLog(metrics_log, resume=resume)
+    checkpoint, first_episode = _setup_checkpoint(agent, metrics, checkpoint_path, resume, env)
+    recorder = TrajectoryRecorder.for_game(record_path, env) if record_path else None
+    
+    episode = first_episode - 1
+    for episode in range(first_episode, episodes + 1):
+        state = env.reset()
+        if recorder is not None:
+            recorder.start_episode(env.episode_seed, episode)
+        episode_reward = 0
+        episode_steps = 0
+        done = False
+        
+        while not done:
+            with profiler.phase('act'):
+                action = agent.act(state)
+            with profiler.phase('env_step'):
+                next_state, reward, done = env.step(action)
+            if recorder is not None:
+                recorder.record(action)
+            with profiler.phase('remember'):
+                agent.remember(state, action, reward, next_state, done)
+            state = next_state
+            episode_reward += reward
+            episode_steps += 1
+            profiler.count('steps')
+            
+            # Entraînement de l'agent
+            if len(agent.memory) > batch_size:
+                with profiler.phase('replay'):
+                    agent.replay(batch_size)
+                profiler.count('updates')
+        
+        if recorder is not None:
+            recorder.end_episode(env.score)
+        _end_episode(agent, metrics, episode, episodes, env.score, episode_reward, episode_steps,
+                     update_target_every, save_every, profiler, checkpoint, checkpoint_every, env)
+    
+    _finish_training(agent, metrics, checkpoint, episode, recorder, env)
+    return agent, metrics
+
 def train_dqn_agent_with_visualization(episodes=1000, batch_size=64, update_target_every=5, 
-                                       render_every=1, save_every=100, fps=30):
+                                       render_every=1, save_every=100, fps=30, profiler=None,
+                                       metrics_log="snake_metrics.csv", checkpoint_path=None,
+                                       checkpoint_every=100, resume=False, memory_path=None,
+                                       record_path=None, agent_params=None, agent_type='dqn',
+                                       loop_detection=None):
     """
     Entraîne l'agent DQN avec visualisation en temps réel
     
@@ -21,19 +188,28 @@ def train_dqn_agent_with_visualization(episodes=1000, batch_size=64, update_targ
         render_every: Afficher le rendu visuel tous les N épisodes
         save_every: Sauvegarder le modèle tous les N épisodes
         fps: Images par seconde pour le rendu
+        profiler: TrainingProfiler optionnel mesurant le temps passé dans chaque phase
+        metrics_log: Journal CSV des métriques par épisode (voir snake_metrics.py)
+        checkpoint_path: Point de reprise complet (voir snake_checkpoint.py), None pour désactiver
+        checkpoint_every: Écrire le point de reprise tous les N épisodes
+        resume: Reprendre l'entraînement depuis checkpoint_path s'il existe
+        memory_path: Répertoire d'une mémoire d'expériences sur disque, rouverte si elle existe
+        record_path: Enregistre chaque épisode (graine et actions) pour le rejouer avec snake_recording.py
+        agent_params: Hyperparamètres passés à DQNAgent (gamma, n_step, hidden_sizes...)
+        agent_type: 'dqn' ou 'tabular' (TabularAgent, voir snake_tabular.py)
+        loop_detection: None, 'end' ou 'penalize' : fin ou pénalité dès qu'un plateau se répète (voir SnakeGame)
     """
+    import pygame
+    from snake_renderer import BoardRenderer, Label, ScoreChart, TextCache
+    
+    profiler = profiler or NullProfiler()
+    
     # Initialisation du jeu et de l'agent
-    env = SnakeGame(width=400, height=400, cell_size=20)
-    state_size = 12
-    action_size = 4
-    agent = DQNAgent(state_size, action_size)
+    env = SnakeGame(width=400, height=400, cell_size=20, loop_detection=loop_detection)
+    agent = _make_agent(agent_type, memory_path, agent_params)
     
     # Essayer de charger un modèle existant
-    try:
-        agent.load("snake_model.h5")
-        print("Modèle existant chargé.")
-    except:
-        print("Aucun modèle existant trouvé. Démarrage avec un nouveau modèle.")
+    _load_existing_model(agent)
     
     # Initialisation de pygame pour la visualisation
     pygame.init()
@@ -53,30 +229,51 @@ def train_dqn_agent_with_visualization(episodes=1000, batch_size=64, update_targ
         'danger': (255, 100, 100)
     }
     
-    # Police pour le texte
-    font = pygame.font.Font(None, 24)
-    font_large = pygame.font.Font(None, 32)
+    # Textes rendus une seule fois par valeur affichée
+    text = TextCache(pygame.font.Font(None, 24))
+    text_large = TextCache(pygame.font.Font(None, 32))
     
     # Variables pour le suivi des performances
-    scores = []
-    episodes_x = []
-    avg_scores = []
-    rewards_history = []
-    max_score = 0
-    episode_rewards = []
+    metrics = MetricsLog(metrics_log, resume=resume)
+    checkpoint, first_episode = _setup_checkpoint(agent, metrics, checkpoint_path, resume, env)
+    recorder = TrajectoryRecorder.for_game(record_path, env) if record_path else None
     
-    # Zone de jeu dans la fenêtre
+    # Zone de jeu dans la fenêtre, redessinée case par case
     game_rect = pygame.Rect(20, 20, env.width, env.height)
+    board = BoardRenderer(screen, game_rect.topleft, env.cell_size, colors)
+    
+    # Statistiques : chaque ligne n'est redessinée que si son texte change
+    labels = {'episode': Label(screen, (500, 30), text_large, colors['bg'])}
+    for i, name in enumerate(('score', 'steps', 'reward', 'epsilon', 'best', 'action',
+                              'danger_front', 'danger_right', 'danger_left')):
+        labels[name] = Label(screen, (500, 70 + i * 30), text, colors['bg'])
+    action_names = ["↑ HAUT", "→ DROITE", "↓ BAS", "← GAUCHE"]
+    danger_titles = ["Devant", "Droite", "Gauche"]
+    
+    # Mini graphique d'historique des scores, mis à jour à chaque fin d'épisode
+    chart = ScoreChart(screen, (500, 350, 280, 200), text.font, colors)
+    
+    # Fond et cadre du plateau, dessinés une seule fois
+    screen.fill(colors['bg'])
+    pygame.draw.rect(screen, colors['grid'], game_rect.inflate(2, 2), 1)
+    pygame.display.flip()
     
     # Boucle d'entraînement
     running = True
-    episode = 0
+    episode = first_episode - 1
     
     while running and episode < episodes:
         episode += 1
         
         # Réinitialisation de l'environnement
         state = env.reset()
+        if recorder is not None:
+            recorder.start_episode(env.episode_seed, episode)
+        
+        # Derniers scores (fenêtre glissante) pour le mini graphique
+        scores = metrics.scores.values()
+        if episode % render_every == 0 and len(scores) > 1:
+            pygame.display.update(chart.draw(scores))
         
         # Variables pour l'épisode actuel
         episode_reward = 0
@@ -89,241 +286,173 @@ def train_dqn_agent_with_visualization(episodes=1000, batch_size=64, update_targ
         # Boucle d'un épisode
         while not done and running:
             # Gestion des événements
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    running = False
-                elif event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_ESCAPE:
+            with profiler.phase('events'):
+                for event in pygame.event.get():
+                    if event.type == pygame.QUIT:
                         running = False
-                    elif event.key == pygame.K_SPACE:
-                        # Pause
-                        paused = True
-                        while paused:
-                            for evt in pygame.event.get():
-                                if evt.type == pygame.QUIT:
-                                    running = False
-                                    paused = False
-                                elif evt.type == pygame.KEYDOWN:
-                                    if evt.key == pygame.K_SPACE:
+                    elif event.type == pygame.KEYDOWN:
+                        if event.key == pygame.K_ESCAPE:
+                            running = False
+                        elif event.key == pygame.K_SPACE:
+                            # Pause
+                            paused = True
+                            while paused:
+                                for evt in pygame.event.get():
+                                    if evt.type == pygame.QUIT:
+                                        running = False
                                         paused = False
-                            pygame.display.update()
-                            clock.tick(10)
-            
+                                    elif evt.type == pygame.KEYDOWN:
+                                        if evt.key == pygame.K_SPACE:
+                                            paused = False
+                                pygame.display.update()
+                                clock.tick(10)
+                
             # L'agent choisit une action
-            action = agent.act(state)
+            with profiler.phase('act'):
+                action = agent.act(state)
             
             # Extrait les informations de danger pour la visualisation
             dangers = [state[4], state[5], state[6]]
             
             # Exécution de l'action
-            next_state, reward, done = env.step(action)
+            with profiler.phase('env_step'):
+                next_state, reward, done = env.step(action)
+            if recorder is not None:
+                recorder.record(action)
             
             # Stockage de l'expérience
-            agent.remember(state, action, reward, next_state, done)
+            with profiler.phase('remember'):
+                agent.remember(state, action, reward, next_state, done)
             
             # Passage à l'état suivant
             state = next_state
             episode_reward += reward
             episode_steps += 1
+            profiler.count('steps')
             
             # Entraînement de l'agent
             if len(agent.memory) > batch_size:
-                agent.replay(batch_size)
+                with profiler.phase('replay'):
+                    agent.replay(batch_size)
+                profiler.count('updates')
             
             # Rendu visuel (si actif pour cet épisode)
             if episode % render_every == 0:
-                # Effacer l'écran
-                screen.fill(colors['bg'])
-                
-                # Dessiner la grille de jeu
-                pygame.draw.rect(screen, colors['grid'], game_rect, 1)
-                
-                # Dessiner la nourriture
-                food_pos = (
-                    game_rect.x + env.food[0],
-                    game_rect.y + env.food[1],
-                    env.cell_size,
-                    env.cell_size
-                )
-                pygame.draw.rect(screen, colors['food'], food_pos)
-                
-                # Dessiner le serpent
-                for segment in env.snake:
-                    segment_pos = (
-                        game_rect.x + segment[0],
-                        game_rect.y + segment[1],
-                        env.cell_size,
-                        env.cell_size
-                    )
-                    pygame.draw.rect(screen, colors['snake'], segment_pos)
-                
-                # Afficher les infos de l'épisode
-                episode_text = f"Episode: {episode}/{episodes}"
-                text_surface = font_large.render(episode_text, True, colors['text'])
-                screen.blit(text_surface, (500, 30))
-                
-                score_text = f"Score actuel: {env.score}"
-                text_surface = font.render(score_text, True, colors['text'])
-                screen.blit(text_surface, (500, 70))
-                
-                steps_text = f"Étapes: {episode_steps}"
-                text_surface = font.render(steps_text, True, colors['text'])
-                screen.blit(text_surface, (500, 100))
-                
-                reward_text = f"Récompense cumulée: {episode_reward:.1f}"
-                text_surface = font.render(reward_text, True, colors['text'])
-                screen.blit(text_surface, (500, 130))
-                
-                epsilon_text = f"Epsilon: {agent.epsilon:.4f}"
-                text_surface = font.render(epsilon_text, True, colors['text'])
-                screen.blit(text_surface, (500, 160))
-                
-                # Afficher le meilleur score
-                if scores:
-                    max_score_text = f"Meilleur score: {max(scores)}"
-                    text_surface = font.render(max_score_text, True, colors['text'])
-                    screen.blit(text_surface, (500, 190))
-                
-                # Afficher l'action actuelle
-                actions = ["↑ HAUT", "→ DROITE", "↓ BAS", "← GAUCHE"]
-                action_text = f"Action: {actions[action]}"
-                text_surface = font.render(action_text, True, colors['text'])
-                screen.blit(text_surface, (500, 220))
-                
-                # Afficher les dangers détectés
-                danger_titles = ["Devant", "Droite", "Gauche"]
-                for i, (danger, title) in enumerate(zip(dangers, danger_titles)):
-                    color = colors['danger'] if danger > 0.5 else colors['text']
-                    danger_text = f"Danger {title}: {'OUI' if danger > 0.5 else 'NON'}"
-                    text_surface = font.render(danger_text, True, color)
-                    screen.blit(text_surface, (500, 250 + i*30))
-                
-                # Afficher un mini graphique d'historique des scores
-                if len(scores) > 1:
-                    chart_rect = pygame.Rect(500, 350, 280, 200)
-                    pygame.draw.rect(screen, colors['chart_bg'], chart_rect)
-                    pygame.draw.rect(screen, colors['text'], chart_rect, 1)
-                    
-                    # Titre du graphique
-                    chart_title = "Historique des scores"
-                    title_surface = font.render(chart_title, True, colors['text'])
-                    screen.blit(title_surface, (chart_rect.centerx - title_surface.get_width()//2, chart_rect.y + 5))
-                    
-                    # Dessine la courbe des scores
-                    last_scores = scores[-100:] if len(scores) > 100 else scores
-                    max_displayable = 100
-                    display_scores = last_scores[-max_displayable:]
+                with profiler.phase('render'):
+                    # Seules les cases et les textes modifiés sont redessinés et envoyés à l'écran
+                    dirty = board.update(env)
+                    lines = [
+                        ('episode', f"Episode: {episode}/{episodes}", colors['text']),
+                        ('score', f"Score actuel: {env.score}", colors['text']),
+                        ('steps', f"Étapes: {episode_steps}", colors['text']),
+                        ('reward', f"Récompense cumulée: {episode_reward:.1f}", colors['text']),
+                        ('epsilon', f"Epsilon: {agent.epsilon:.4f}", colors['text']),
+                        ('action', f"Action: {action_names[action]}", colors['text'])
+                    ]
+                    if scores:
+                        lines.append(('best', f"Meilleur score: {metrics.max_score}", colors['text']))
+                    for name, danger, title in zip(('danger_front', 'danger_right', 'danger_left'),
+                                                   dangers, danger_titles):
+                        color = colors['danger'] if danger > 0.5 else colors['text']
+                        lines.append((name, f"Danger {title}: {'OUI' if danger > 0.5 else 'NON'}", color))
+                    for name, line, color in lines:
+                        rect = labels[name].set(line, color)
+                        if rect is not None:
+                            dirty.append(rect)
                     
-                    if len(display_scores) > 1:
-                        max_score_chart = max(display_scores) if max(display_scores) > 0 else 1
-                        
-                        for i in range(len(display_scores) - 1):
-                            # Normaliser les valeurs pour la hauteur du graphique
-                            x1 = chart_rect.x + i * (chart_rect.width / (len(display_scores) - 1))
-                            y1 = chart_rect.bottom - (display_scores[i] / max_score_chart) * (chart_rect.height - 30)
-                            x2 = chart_rect.x + (i + 1) * (chart_rect.width / (len(display_scores) - 1))
-                            y2 = chart_rect.bottom - (display_scores[i + 1] / max_score_chart) * (chart_rect.height - 30)
-                            
-                            pygame.draw.line(screen, colors['chart_line'], (x1, y1), (x2, y2), 2)
-                
-                # Mise à jour de l'affichage
-                pygame.display.update()
-                clock.tick(fps if episode_steps > 1 else 1)  # Au premier pas, attend une seconde
+                    # Mise à jour de l'affichage
+                    pygame.display.update(dirty)
+                with profiler.phase('throttle'):
+                    clock.tick(fps if episode_steps > 1 else 1)  # Au premier pas, attend une seconde
         
         # Fin de l'épisode
-        score = env.score
-        scores.append(score)
-        episodes_x.append(episode)
-        episode_rewards.append(episode_reward)
-        avg_score = np.mean(scores[-100:]) if len(scores) >= 100 else np.mean(scores)
-        avg_scores.append(avg_score)
-        
-        # Mise à jour du modèle cible périodiquement
-        if episode % update_target_every == 0:
-            agent.update_target_model()
-        
-        # Sauvegarde du meilleur modèle
-        if score > max_score:
-            max_score = score
-            agent.save("snake_model_best.h5")
-            print(f"Nouveau meilleur score: {score} à l'épisode {episode}! Modèle sauvegardé.")
-        
-        # Affichage des progrès dans la console
-        if episode % 10 == 0 or score > 3:
-            print(f"Episode: {episode}/{episodes}, Score: {score}, Récompense: {episode_reward:.1f}, Avg Score: {avg_score:.2f}, Epsilon: {agent.epsilon:.4f}")
-        
-        # Sauvegarde périodique du modèle
-        if episode % save_every == 0:
-            agent.save(f"snake_model_checkpoint_{episode}.h5")
-            
-            # Sauvegarde des graphiques
-            plt.figure(figsize=(15, 10))
-            
-            # Score par épisode
-            plt.subplot(2, 2, 1)
-            plt.plot(episodes_x, scores)
-            plt.xlabel('Episode')
-            plt.ylabel('Score')
-            plt.title('Score par épisode')
-            
-            # Score moyen
-            plt.subplot(2, 2, 2)
-            plt.plot(episodes_x, avg_scores)
-            plt.xlabel('Episode')
-            plt.ylabel('Score moyen (100 épisodes)')
-            plt.title('Score moyen')
-            
-            # Récompense par épisode
-            plt.subplot(2, 2, 3)
-            plt.plot(episodes_x, episode_rewards)
-            plt.xlabel('Episode')
-            plt.ylabel('Récompense totale')
-            plt.title('Récompense par épisode')
-            
-            # Distribution des scores
-            plt.subplot(2, 2, 4)
-            plt.hist(scores, bins=10)
-            plt.xlabel('Score')
-            plt.ylabel('Fréquence')
-            plt.title('Distribution des scores')
-            
-            plt.tight_layout()
-            plt.savefig(f"snake_training_progress_{episode}.png")
-            plt.close()
+        if recorder is not None:
+            recorder.end_episode(env.score)
+        _end_episode(agent, metrics, episode, episodes, env.score, episode_reward, episode_steps,
+                     update_target_every, save_every, profiler, checkpoint, checkpoint_every, env)
     
     # Fin de l'entraînement
     pygame.quit()
+    _finish_training(agent, metrics, checkpoint, episode, recorder, env)
     
-    # Sauvegarde du modèle final
-    agent.save("snake_model.h5")
-    
-    # Sauvegarde du graphique final
-    plt.figure(figsize=(12, 6))
-    plt.subplot(1, 2, 1)
-    plt.plot(episodes_x, scores)
-    plt.xlabel('Episode')
-    plt.ylabel('Score')
-    plt.title('Evolution du score')
-    
-    plt.subplot(1, 2, 2)
-    plt.plot(episodes_x, avg_scores)
-    plt.xlabel('Episode')
-    plt.ylabel('Score moyen')
-    plt.title('Evolution du score moyen')
-    
-    plt.tight_layout()
-    plt.savefig("snake_final_training_curve.png")
-    plt.close()
-    
-    return agent, scores
+    return agent, metrics
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Entraînement de l'agent DQN pour Snake")
+    parser.add_argument('--headless', action='store_true',
+                        help="Entraîner sans fenêtre pygame, à pleine vitesse")
+    parser.add_argument('--episodes', type=int, default=1000)
+    parser.add_argument('--batch-size', type=int, default=64)
+    parser.add_argument('--update-target-every', type=int, default=5)
+    parser.add_argument('--save-every', type=int, default=100)
+    parser.add_argument('--render-every', type=int, default=1,
+                        help="Afficher le rendu visuel tous les N épisodes")
+    parser.add_argument('--fps', type=int, default=30,
+                        help="Images par seconde (diminuez pour ralentir)")
+    parser.add_argument('--profile', metavar='LOG',
+                        help="Journal JSON par épisode du temps passé dans chaque phase")
+    parser.add_argument('--checkpoint', metavar='PATH', default='snake_checkpoint.npz',
+                        help="Point de reprise complet (poids, optimiseur, mémoire...)")
+    parser.add_argument('--checkpoint-every', type=int, default=100)
+    parser.add_argument('--resume', action='store_true',
+                        help="Reprendre l'entraînement depuis le point de reprise")
+    parser.add_argument('--memory-path', metavar='DIR',
+                        help="Mémoire d'expériences sur disque (np.memmap), conservée entre les entraînements")
+    parser.add_argument('--memory-readonly', action='store_true',
+                        help="Lit seulement la mémoire de --memory-path, sans y ajouter les épisodes joués "
+                             "(mémoire partagée par plusieurs learners)")
+    parser.add_argument('--record', metavar='PATH',
+                        help="Enregistre chaque épisode pour le rejouer avec snake_recording.py")
+    parser.add_argument('--agent', choices=('dqn', 'tabular'), default='dqn',
+                        help="Réseau Keras ou table Q NumPy (entraînement en quelques secondes, sans TensorFlow)")
+    parser.add_argument('--n-step', type=int, default=1,
+                        help="Nombre de pas des retours de Bellman (la récompense remonte plus vite)")
+    parser.add_argument('--loop-detection', choices=('end', 'penalize'),
+                        help="Termine ou pénalise l'épisode dès que le serpent revient sur un plateau déjà vu")
+    args = parser.parse_args()
+    agent_params = {'n_step': args.n_step}
+    if args.memory_readonly:
+        if not args.memory_path:
+            parser.error("--memory-readonly nécessite --memory-path")
+        agent_params['memory_readonly'] = True
+    profiler = TrainingProfiler(args.profile) if args.profile else None
+    
     # Adaptez ces paramètres selon vos besoins
-    agent, scores = train_dqn_agent_with_visualization(
-        episodes=1000,
-        batch_size=64,
-        update_target_every=5,
-        render_every=1,  # Afficher chaque épisode
-        save_every=100,
-        fps=30  # 30 images par seconde (diminuez pour ralentir)
-    )
\ No newline at end of file
+    if args.headless:
+        agent, metrics = train_dqn_agent_headless(
+            episodes=args.episodes,
+            batch_size=args.batch_size,
+            update_target_every=args.update_target_every,
+            save_every=args.save_every,
+            profiler=profiler,
+            checkpoint_path=args.checkpoint,
+            checkpoint_every=args.checkpoint_every,
+            resume=args.resume,
+            memory_path=args.memory_path,
+            record_path=args.record,
+            agent_params=agent_params,
+            agent_type=args.agent,
+            loop_detection=args.loop_detection
+        )
+    else:
+        agent, metrics = train_dqn_agent_with_visualization(
+            episodes=args.episodes,
+            batch_size=args.batch_size,
+            update_target_every=args.update_target_every,
+            render_every=args.render_every,
+            save_every=args.save_every,
+            fps=args.fps,
+            profiler=profiler,
+            checkpoint_path=args.checkpoint,
+            checkpoint_every=args.checkpoint_every,
+            resume=args.resume,
+            memory_path=args.memory_path,
+            record_path=args.record,
+            agent_params=agent_params,
+            agent_type=args.agent,
+            loop_detection=args.loop_detection
+        )
+    
+    if profiler:
+        profiler.print_summary()
+        profiler.close()